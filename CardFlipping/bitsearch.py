@@ -0,0 +1,166 @@
+"""Exhaustive search for the card flipping game on bitmasks
+
+The state of the table is kept in two integers: bit i of present is set while card i is on the table, and bit i of
+face_up is set while card i is face up. Removing card i and flipping its neighbors is then
+
+    present &= ~bit
+    face_up = (face_up & ~bit) ^ (((bit << 1) | (bit >> 1)) & present)
+
+The same state is often reached with different move orders, so the search remembers the states that can't be solved
+(or the number of solutions of a state, when counting) in a transposition table. The table has a fixed capacity and
+evicts the least recently used states, so memory stays bounded on long sequences.
+
+This is useful for the variants that still need a full search, like counting solutions or restricting the moves
+allowed. For just finding a solution, solve in cardflipping.py runs in linear time.
+"""
+
+from collections import OrderedDict
+
+from cardflipping import play
+
+
+class TranspositionTable:
+    """A bounded dictionary of search results, evicting the least recently used entry when full.
+
+    Attributes:
+        capacity (int): Maximum number of entries.
+        lookups (int): Number of calls to get.
+        hits (int): Number of calls to get that found the entry.
+        evictions (int): Number of entries evicted.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        self.lookups += 1
+        value = self._entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class BitmaskSearch:
+    """Depth first search over the states of a sequence.
+
+    Attributes:
+        sequence (str): The input, a sequence of 0 and 1.
+        move_filter: Optional function (present, face_up, index) returning False for the moves not allowed. It must
+            only depend on its arguments, since the results are cached by state.
+        table (TranspositionTable): Dead states for solve, solution counts for count.
+        nodes (int): Number of states visited by the last search.
+    """
+
+    def __init__(self, sequence, table_size=1 << 20, move_filter=None):
+        if any(card not in "01" for card in sequence):
+            raise ValueError(f"Invalid sequence: {sequence}")
+        self.sequence = sequence
+        self.move_filter = move_filter
+        self.table_size = table_size
+        self.table = TranspositionTable(table_size)
+        self.nodes = 0
+        self._length = len(sequence)
+        self._start_present = (1 << len(sequence)) - 1
+        self._start_face_up = sum(1 << i for i, card in enumerate(sequence) if card == "1")
+
+    @property
+    def hit_rate(self):
+        return self.table.hit_rate
+
+    def _moves(self, present, face_up):
+        """Yields the index, the bit and the new state of every allowed move."""
+        candidates = face_up
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            index = bit.bit_length() - 1
+            if self.move_filter is not None and not self.move_filter(present, face_up, index):
+                continue
+            new_present = present & ~bit
+            new_face_up = (face_up & ~bit) ^ (((bit << 1) | (bit >> 1)) & new_present)
+            yield index, new_present, new_face_up
+
+    def _key(self, present, face_up):
+        return (present << self._length) | face_up
+
+    def _reset(self):
+        self.table = TranspositionTable(self.table_size)
+        self.nodes = 0
+
+    def solve(self):
+        """Returns a list of moves that removes every card, or None if there is no solution."""
+        self._reset()
+        moves = []
+        if self._solve(self._start_present, self._start_face_up, moves):
+            return moves
+        return None
+
+    def _solve(self, present, face_up, moves):
+        self.nodes += 1
+        if not present:
+            return True
+        key = self._key(present, face_up)
+        if self.table.get(key) is not None:  # Already known to be a dead end
+            return False
+        for index, new_present, new_face_up in self._moves(present, face_up):
+            moves.append(index)
+            if self._solve(new_present, new_face_up, moves):
+                return True
+            moves.pop()
+        self.table.put(key, True)
+        return False
+
+    def count(self):
+        """Returns the number of different move sequences that remove every card."""
+        self._reset()
+        return self._count(self._start_present, self._start_face_up)
+
+    def _count(self, present, face_up):
+        self.nodes += 1
+        if not present:
+            return 1
+        key = self._key(present, face_up)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+        total = 0
+        for _, new_present, new_face_up in self._moves(present, face_up):
+            total += self._count(new_present, new_face_up)
+        self.table.put(key, total)
+        return total
+
+
+if __name__ == "__main__":
+    for sequence in ("0100110", "01001100111", "100001100101000"):
+        search = BitmaskSearch(sequence)
+        moves = search.solve()
+        print(f"\nInput: {sequence}")
+        print(f"Moves: {moves}" if moves is not None else "No solution found")
+        print(f"Nodes visited: {search.nodes}, cache hit rate: {search.hit_rate:.1%}")
+        if moves is not None:
+            assert play(sequence, moves)
+        solutions = search.count()
+        print(f"Solutions: {solutions}, nodes visited: {search.nodes}, cache hit rate: {search.hit_rate:.1%}")
+
+    # Only remove cards from the left half first, then anything
+    search = BitmaskSearch("0100110", move_filter=lambda present, face_up, index: index < 4 or not present & 0b1111)
+    print(f"\nConstrained solutions of 0100110: {search.count()}")
@@ -13,7 +13,15 @@ As input you will be given a sequence of 0 and 1, no spaces.
 
 Output Description
 Your program must print a sequence of moves that leads to a win. If there is no solution, it must print "no solution".
-In general, if there's one solution then there are many possible solutions."""
+In general, if there's one solution then there are many possible solutions.
+
+A sequence can be solved if and only if it has an odd number of face up cards, or no cards at all. Removing the leftmost
+face up card leaves only face down cards on its left, with the nearest one flipped face up, so they can be removed one
+after the other from right to left. The cards on the right keep an odd number of face up cards (one was removed and the
+neighbor flipped), so the same move can be repeated on them. solve builds the moves this way in linear time, while
+backtracking explores every move and is kept to verify it."""
+
+import random
 
 
 def backtracking(state, moves):
@@ -47,6 +55,60 @@ def backtracking(state, moves):
     return False
 
 
+def solve(sequence):
+    """Returns a list of moves that removes every card of sequence, or None if there is no solution.
+
+    An empty sequence is already solved, with no moves."""
+    if any(card not in "01" for card in sequence):
+        raise ValueError(f"Invalid sequence: {sequence}")
+    if sequence and sequence.count("1") % 2 == 0:
+        return None
+
+    moves = []
+    start = 0  # First card still on the table, it has been flipped if a card was removed before it
+    for index, card in enumerate(sequence):
+        face_up = (card == "1") != (index == start and start > 0)
+        if face_up:
+            moves.append(index)
+            # The cards on the left are face down, except the neighbor that was just flipped
+            moves.extend(range(index - 1, start - 1, -1))
+            start = index + 1
+    return moves
+
+
+def play(sequence, moves):
+    """Returns True if moves are legal and remove every card of sequence."""
+    state = list(sequence)
+    for index in moves:
+        if not 0 <= index < len(state) or state[index] != "1":
+            return False
+        state[index] = "."
+        for neighbor in (index - 1, index + 1):
+            if 0 <= neighbor < len(state) and state[neighbor] != ".":
+                state[neighbor] = "1" if state[neighbor] == "0" else "0"
+    return all(card == "." for card in state)
+
+
+def property_check(trials=500, max_length=9, seed=None):
+    """Cross-checks solve against backtracking on random sequences.
+
+    Returns:
+        A list of the sequences where solve is wrong: it finds no solution while backtracking does, or its moves
+        don't remove every card.
+    """
+    generator = random.Random(seed)
+    failures = []
+    for _ in range(trials):
+        sequence = "".join(generator.choice("01") for _ in range(generator.randint(0, max_length)))
+        moves = solve(sequence)
+        if moves is None:
+            if backtracking(list(sequence), []):
+                failures.append(sequence)
+        elif not play(sequence, moves):
+            failures.append(sequence)
+    return failures
+
+
 def run_backtracking(sequence):
     print()
     sequence_as_list = list(sequence)
@@ -62,7 +124,22 @@ def run_backtracking(sequence):
         print("No solution found")
 
 
-run_backtracking("0100110")
-run_backtracking("01001100111")
-run_backtracking("100001100101000")
-run_backtracking("010111111111100100101000100110111000101111001001011011000011000")
+def run_solver(sequence):
+    print()
+    print(f"Input: {sequence}")
+
+    moves = solve(sequence)
+
+    if moves is not None:
+        print("Solution found. Moves:")
+        print(moves)
+    else:
+        print("No solution found")
+
+
+if __name__ == "__main__":
+    run_backtracking("0100110")
+    run_backtracking("01001100111")
+    run_backtracking("100001100101000")
+    run_solver("010111111111100100101000100110111000101111001001011011000011000")
+    print(f"\nWrong answers on random sequences: {len(property_check(seed=0))}")
@@ -0,0 +1,106 @@
+"""Counting and sampling the solutions of the card flipping game
+
+Removing a card splits the row into two segments that don't interact anymore, so the solutions of a row are the
+solutions of the left segment and of the right segment, interleaved in any order. For a first move k in the segment
+l..r the number of solutions is
+
+    count(l, k - 1) * count(k + 1, r) * binomial(r - l, k - l)
+
+The state of a segment only depends on its bounds: its first card was flipped once if the card before it was
+removed (l > 0) and its last card once if the card after it was removed (r < n - 1). So there are O(n^2) segments and
+the counts of all of them are computed in O(n^3) big integer operations, smallest segments first.
+
+The same table gives uniform samples: the first move is drawn with a probability proportional to its number of
+solutions, then the two segments are sampled and merged with a random interleaving.
+"""
+
+import math
+import random
+
+from bitsearch import BitmaskSearch
+from cardflipping import play
+
+
+class SegmentCounter:
+    """Number of solutions of every segment of a sequence.
+
+    Attributes:
+        sequence (str): The input, a sequence of 0 and 1.
+    """
+
+    def __init__(self, sequence):
+        if any(card not in "01" for card in sequence):
+            raise ValueError(f"Invalid sequence: {sequence}")
+        self.sequence = sequence
+        n = len(sequence)
+        # counts[l][r] for the segment l..r, the empty segments l..l - 1 have exactly one solution
+        self._counts = [[0] * (n + 1) for _ in range(n + 1)]
+        for left in range(n + 1):
+            self._counts[left][left - 1] = 1
+        for length in range(1, n + 1):
+            for left in range(n - length + 1):
+                right = left + length - 1
+                self._counts[left][right] = sum(weight for _, weight in self._first_moves(left, right))
+
+    def _face_up(self, index, left, right):
+        """Returns True if card index is face up while left..right is the segment it belongs to."""
+        flips = (index == left and left > 0) + (index == right and right < len(self.sequence) - 1)
+        return (self.sequence[index] == "1") != (flips % 2 == 1)
+
+    def _first_moves(self, left, right):
+        """Yields every first move of the segment with the number of solutions starting with it."""
+        for k in range(left, right + 1):
+            if self._face_up(k, left, right):
+                ways = self.count(left, k - 1) * self.count(k + 1, right)
+                if ways:
+                    yield k, ways * math.comb(right - left, k - left)
+
+    def count(self, left=0, right=None):
+        """Returns the number of move sequences that remove every card of the segment left..right."""
+        if right is None:
+            right = len(self.sequence) - 1
+        return self._counts[left][right]
+
+    def sample(self, generator=random):
+        """Returns a solution drawn uniformly among all the solutions, or None if there is none."""
+        if not self.count():
+            return None
+        return self._sample(0, len(self.sequence) - 1, generator)
+
+    def _sample(self, left, right, generator):
+        if left > right:
+            return []
+        # Draw the first move proportionally to its number of solutions
+        draw = generator.randrange(self.count(left, right))
+        for k, weight in self._first_moves(left, right):
+            if draw < weight:
+                break
+            draw -= weight
+
+        left_moves = self._sample(left, k - 1, generator)
+        right_moves = self._sample(k + 1, right, generator)
+        # Uniform interleaving: pick which positions of the merged sequence come from the left segment
+        positions = set(generator.sample(range(right - left), len(left_moves)))
+        left_moves.reverse()
+        right_moves.reverse()
+        moves = [k]
+        for position in range(right - left):
+            moves.append(left_moves.pop() if position in positions else right_moves.pop())
+        return moves
+
+
+if __name__ == "__main__":
+    for sequence in ("0100110", "01001100111", "100001100101000"):
+        counter = SegmentCounter(sequence)
+        search = BitmaskSearch(sequence)
+        print(f"\nInput: {sequence}")
+        print(f"Solutions: {counter.count()} (exhaustive search: {search.count()})")
+        moves = counter.sample()
+        if moves is not None:
+            print(f"Random solution: {moves}, valid: {play(sequence, moves)}")
+
+    generator = random.Random(0)
+    sequence = "".join(generator.choice("01") for _ in range(199))
+    sequence += "0" if sequence.count("1") % 2 else "1"  # Make the number of face up cards odd
+    counter = SegmentCounter(sequence)
+    print(f"\nA {len(sequence)} cards deal has {counter.count()} solutions")
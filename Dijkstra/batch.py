@@ -0,0 +1,127 @@
+"""Distance matrices from many sources with Dijkstra algorithm
+
+The sources are split across a pool of worker processes. Every worker gets the same read-only graph: an in-memory
+graph is inherited by the forked workers, while a CSRGraph file (see csrgraph.py) is memory-mapped by every worker,
+so the operating system shares its pages between them.
+
+Rows of the matrix are written as soon as they come back from the workers. When the matrix doesn't fit in
+memory_limit it must be written to a .npy file on disk, given by the caller, and it is returned as a memory-mapped
+array, so the memory used stays bounded by a few rows per worker.
+"""
+
+import multiprocessing
+import os
+from collections import namedtuple
+
+import numpy
+
+from csrgraph import CSRGraph, csr_shortest_paths
+from dijkstra import graph as example_graph, shortest_paths
+
+# distances[i][j] is the distance from sources[i] to nodes[j], infinity if not reachable. predecessors[i][j] is the
+# column of the node before nodes[j] on the shortest path from sources[i], -1 for none, or predecessors is None.
+DistanceMatrix = namedtuple("DistanceMatrix", ["sources", "nodes", "distances", "predecessors"])
+
+# Read-only state of every worker process, set by _init_worker
+_graph = None
+_nodes = None
+_index = None
+_with_predecessors = False
+
+
+def _init_worker(graph, with_predecessors):
+    global _graph, _nodes, _index, _with_predecessors
+    if isinstance(graph, str):  # Path of a CSRGraph file
+        graph = CSRGraph.load(graph)
+    _graph = graph
+    _nodes = list(graph)
+    _index = {node: i for i, node in enumerate(_nodes)}
+    _with_predecessors = with_predecessors
+
+
+def _row(source):
+    """Returns the distances from source and the predecessors (or None) as two NumPy arrays."""
+    if isinstance(_graph, CSRGraph):
+        distances, prev = csr_shortest_paths(_graph, source)  # Already lists indexed by node ID
+    else:
+        distances, prev = shortest_paths(_graph, source)
+        distances = [distances[node] for node in _nodes]
+        prev = [prev[node] for node in _nodes]
+
+    row = numpy.fromiter((numpy.inf if d is None else d for d in distances), dtype=numpy.float64, count=len(_nodes))
+    if not _with_predecessors:
+        return row, None
+    predecessors = numpy.fromiter((-1 if p is None else _index[p] for p in prev), dtype=numpy.int64,
+                                  count=len(_nodes))
+    return row, predecessors
+
+
+def distance_matrix(graph, sources="all", processes=None, predecessors=False, output=None,
+                    memory_limit=1 << 30, chunk_size=16):
+    """Computes the distances from every source to every node of graph.
+
+    Attributes:
+        graph: A dictionary graph, a CSRGraph, or the path of a CSRGraph file written by CSRGraph.save.
+        sources: A list of source nodes, or "all".
+        processes (int): Number of worker processes, by default one per CPU. With 1 everything runs in this process.
+        predecessors (bool): Also compute the predecessor matrix.
+        output (str): Path of a .npy file to write the distance matrix to. The predecessors go to the same path with
+            the .prev.npy extension. Required when the matrices need more than memory_limit bytes, or a
+            ValueError is raised. The files are left to the caller.
+        memory_limit (int): Maximum size in bytes of the matrices kept in memory.
+        chunk_size (int): Number of sources sent to a worker at a time.
+
+    Returns:
+        A DistanceMatrix. The matrices are memory-mapped arrays when written to disk.
+    """
+    loaded_graph = CSRGraph.load(graph) if isinstance(graph, str) else graph
+    nodes = list(loaded_graph)
+    sources = nodes if sources == "all" else list(sources)
+    shape = (len(sources), len(nodes))
+
+    size = shape[0] * shape[1] * (16 if predecessors else 8)
+    if output is None and size > memory_limit:
+        raise ValueError(f"The matrices need {size} bytes, more than memory_limit: give an output file")
+
+    if output is None:
+        distances = numpy.empty(shape, dtype=numpy.float64)
+        prev = numpy.empty(shape, dtype=numpy.int64) if predecessors else None
+    else:
+        distances = numpy.lib.format.open_memmap(output, mode="w+", dtype=numpy.float64, shape=shape)
+        prev = None
+        if predecessors:
+            prev = numpy.lib.format.open_memmap(os.path.splitext(output)[0] + ".prev.npy", mode="w+",
+                                                dtype=numpy.int64, shape=shape)
+
+    if processes == 1:
+        _init_worker(loaded_graph, predecessors)
+        rows = map(_row, sources)
+        pool = None
+    else:
+        # Forked workers inherit the graph without copying it, a CSRGraph file is memory-mapped again
+        shared = graph if isinstance(graph, str) else loaded_graph
+        pool = multiprocessing.Pool(processes, _init_worker, (shared, predecessors))
+        rows = pool.imap(_row, sources, chunksize=chunk_size)
+
+    try:
+        for i, (row, predecessor_row) in enumerate(rows):
+            distances[i] = row
+            if predecessors:
+                prev[i] = predecessor_row
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if output is not None:
+        distances.flush()
+        if predecessors:
+            prev.flush()
+    return DistanceMatrix(sources, nodes, distances, prev)
+
+
+if __name__ == "__main__":
+    matrix = distance_matrix(example_graph, predecessors=True, processes=2)
+    print(f"Nodes: {matrix.nodes}")
+    for source, row, predecessor_row in zip(matrix.sources, matrix.distances, matrix.predecessors):
+        print(f"{source}: {row} {predecessor_row}")
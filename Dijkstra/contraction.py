@@ -0,0 +1,260 @@
+"""Contraction hierarchies for repeated shortest path queries on a static graph
+
+Preprocessing removes ("contracts") the nodes one at a time, from the least to the most important. When a node v is
+contracted, every path u -> v -> x that is the only shortest path between u and x is replaced by a shortcut edge
+u -> x, so the distances between the remaining nodes don't change. The importance of a node is estimated with the edge
+difference (shortcuts added minus edges removed) plus the number of neighbors already contracted, and it is updated
+lazily while contracting.
+
+A query is a bidirectional Dijkstra search where the forward search from the source only follows edges to more
+important nodes and the backward search from the target only follows edges coming from more important nodes. Both
+searches meet at the most important node of the shortest path, after settling a small fraction of the graph. Shortcuts
+remember the node they skip, so the path is unpacked back into original edges.
+
+Works on the dictionary graphs of dijkstra.py and on CSRGraph from csrgraph.py.
+"""
+
+import heapq
+import math
+import pickle
+import random
+
+from dijkstra import graph as example_graph, shortest_paths
+from landmarks import QueryResult
+
+INFINITY = float("inf")
+
+
+class ContractionHierarchy:
+    """A contraction hierarchy of a static graph.
+
+    Attributes:
+        nodes (list): Every node of the graph, internally nodes are identified by their position in this list.
+        rank (list): The contraction order of every node, higher is more important.
+        upward (list): For every node, the (node, weight) edges to more important nodes.
+        downward (list): For every node, the (node, weight) edges coming from more important nodes.
+        middle (dict): For every shortcut (u, x), the contracted node v it replaces the path u -> v -> x of.
+        shortcut_count (int): The number of shortcuts added.
+    """
+
+    def __init__(self, graph, witness_limit=500):
+        """Builds the hierarchy.
+
+        Attributes:
+            graph: The graph, a dictionary or a CSRGraph.
+            witness_limit (int): Maximum number of nodes settled by every witness search. A lower value makes the
+                preprocessing faster but can add unnecessary shortcuts.
+        """
+        self.nodes = list(graph)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.witness_limit = witness_limit
+        n = len(self.nodes)
+
+        # Remaining graph, keeping only the lightest of parallel edges
+        self._out = [{} for _ in range(n)]
+        self._in = [{} for _ in range(n)]
+        for node in graph:
+            u = self.index[node]
+            for neighbor, weight in graph[node]:
+                x = self.index[neighbor]
+                if u != x and weight < self._out[u].get(x, INFINITY):
+                    self._out[u][x] = weight
+                    self._in[x][u] = weight
+
+        self.rank = [None] * n
+        self.upward = [None] * n
+        self.downward = [None] * n
+        self.middle = {}
+        self.shortcut_count = 0
+        self._contract_all()
+        del self._out, self._in
+
+    def _witness_distances(self, source, excluded, limit):
+        """Dijkstra search in the remaining graph, avoiding excluded and stopping past limit."""
+        distances = {source: 0}
+        heap = [(0, source)]
+        settled = 0
+        while heap and settled < self.witness_limit:
+            distance, u = heapq.heappop(heap)
+            if distance > distances[u]:
+                continue
+            if distance > limit:
+                break
+            settled += 1
+            for x, weight in self._out[u].items():
+                new_distance = distance + weight
+                if x != excluded and new_distance < distances.get(x, INFINITY):
+                    distances[x] = new_distance
+                    heapq.heappush(heap, (new_distance, x))
+        return distances
+
+    def _shortcuts(self, v):
+        """Returns the (u, x, weight) shortcuts needed to contract v."""
+        shortcuts = []
+        for u, weight_in in self._in[v].items():
+            candidates = [(x, weight_in + weight_out) for x, weight_out in self._out[v].items() if x != u]
+            if not candidates:
+                continue
+            distances = self._witness_distances(u, v, max(weight for _, weight in candidates))
+            for x, weight in candidates:
+                if distances.get(x, INFINITY) > weight:  # No witness path: u -> v -> x is the only shortest path
+                    shortcuts.append((u, x, weight))
+        return shortcuts
+
+    def _priority(self, v, contracted_neighbors):
+        edge_difference = len(self._shortcuts(v)) - len(self._in[v]) - len(self._out[v])
+        return edge_difference + contracted_neighbors[v]
+
+    def _contract_all(self):
+        n = len(self.nodes)
+        contracted_neighbors = [0] * n
+        heap = [(self._priority(v, contracted_neighbors), v) for v in range(n)]
+        heapq.heapify(heap)
+        order = 0
+
+        while heap:
+            _, v = heapq.heappop(heap)
+            # Lazy update: the priority may have grown since it was pushed
+            priority = self._priority(v, contracted_neighbors)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, v))
+                continue
+
+            shortcuts = self._shortcuts(v)
+            self.rank[v] = order
+            order += 1
+            # The remaining neighbors of v are all more important than v
+            self.upward[v] = list(self._out[v].items())
+            self.downward[v] = list(self._in[v].items())
+            for x in self._out[v]:
+                del self._in[x][v]
+                contracted_neighbors[x] += 1
+            for u in self._in[v]:
+                del self._out[u][v]
+                contracted_neighbors[u] += 1
+            self._out[v] = {}
+            self._in[v] = {}
+
+            for u, x, weight in shortcuts:
+                if weight < self._out[u].get(x, INFINITY):
+                    self._out[u][x] = weight
+                    self._in[x][u] = weight
+                    if (u, x) not in self.middle:
+                        self.shortcut_count += 1
+                    self.middle[(u, x)] = v
+
+    def _unpack(self, u, x):
+        """Returns the original nodes of the edge u -> x, without u."""
+        path = []
+        stack = [(u, x)]
+        while stack:
+            a, b = stack.pop()
+            v = self.middle.get((a, b))
+            if v is None:
+                path.append(b)
+            else:
+                stack.append((v, b))
+                stack.append((a, v))
+        return path
+
+    def query(self, source, target):
+        """Computes the shortest path from source to target.
+
+        Returns:
+            A QueryResult, with the path unpacked to the nodes of the original graph.
+        """
+        s, t = self.index[source], self.index[target]
+        graphs = (self.upward, self.downward)
+        distances = ({s: 0}, {t: 0})
+        prev = ({s: None}, {t: None})
+        heaps = ([(0, s)], [(0, t)])
+        settled = 0
+        best = INFINITY
+        meeting_node = None
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                if not heaps[side]:
+                    continue
+                distance, u = heapq.heappop(heaps[side])
+                if distance > distances[side][u]:
+                    continue
+                if distance >= best:  # Nothing shorter can be found on this side
+                    heaps[side].clear()
+                    continue
+                settled += 1
+                if u in distances[1 - side] and distance + distances[1 - side][u] < best:
+                    best = distance + distances[1 - side][u]
+                    meeting_node = u
+                for x, weight in graphs[side][u]:
+                    new_distance = distance + weight
+                    if new_distance < distances[side].get(x, INFINITY):
+                        distances[side][x] = new_distance
+                        prev[side][x] = u
+                        heapq.heappush(heaps[side], (new_distance, x))
+
+        if meeting_node is None:
+            return QueryResult(None, None, settled)
+
+        # Hierarchy nodes from source to the meeting node and then to target
+        hierarchy_path = [meeting_node]
+        while prev[0][hierarchy_path[-1]] is not None:
+            hierarchy_path.append(prev[0][hierarchy_path[-1]])
+        hierarchy_path.reverse()
+        while prev[1][hierarchy_path[-1]] is not None:
+            hierarchy_path.append(prev[1][hierarchy_path[-1]])
+
+        path = [s]
+        for u, x in zip(hierarchy_path, hierarchy_path[1:]):
+            path.extend(self._unpack(u, x))
+        return QueryResult(best, [self.nodes[i] for i in path], settled)
+
+    def save(self, path):
+        """Writes the hierarchy to path."""
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        """Reads a hierarchy written by save."""
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def verify(hierarchy, graph, query_count=100, seed=None):
+    """Cross-checks random queries of hierarchy against plain Dijkstra on graph.
+
+    Returns:
+        A list of (source, target, expected distance, hierarchy distance) for every wrong answer.
+    """
+    generator = random.Random(seed)
+    nodes = list(graph)
+    mismatches = []
+    for _ in range(query_count):
+        source, target = generator.choice(nodes), generator.choice(nodes)
+        expected = shortest_paths(graph, source, target)[0][target]
+        result = hierarchy.query(source, target)
+        valid = result.distance == expected or (
+            None not in (result.distance, expected) and math.isclose(result.distance, expected))
+        if valid and result.path is not None:
+            # The unpacked path must be made of original edges adding up to the distance
+            length = 0
+            for u, x in zip(result.path, result.path[1:]):
+                weights = [weight for neighbor, weight in graph[u] if neighbor == x]
+                if not weights:
+                    valid = False
+                    break
+                length += min(weights)
+            valid = valid and math.isclose(length, expected)
+        if not valid:
+            mismatches.append((source, target, expected, result.distance))
+    return mismatches
+
+
+if __name__ == "__main__":
+    hierarchy = ContractionHierarchy(example_graph)
+    print(f"Contraction order: {sorted(example_graph, key=lambda node: hierarchy.rank[hierarchy.index[node]])}")
+    print(f"Shortcuts added: {hierarchy.shortcut_count}")
+    result = hierarchy.query("A", "D")
+    print(f"A => D: distance {result.distance}, path {result.path}, {result.settled} nodes settled")
+    print(f"Wrong answers on random queries: {len(verify(hierarchy, example_graph, seed=0))}")
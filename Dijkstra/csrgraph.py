@@ -0,0 +1,270 @@
+"""Compressed sparse row (CSR) graph for the Dijkstra algorithm
+
+A dictionary of lists of (node, weight) tuples costs a few hundred bytes per edge. Here the edges of node i are stored
+in three flat arrays: targets[offsets[i]:offsets[i + 1]] are its neighbors and weights[offsets[i]:offsets[i + 1]] the
+weights of the edges. Node names are interned to integer IDs, so an edge costs 12 bytes.
+
+CSRGraph behaves like the dictionary used in dijkstra.py (graph[node] gives (node, weight) pairs, iterating gives the
+nodes), with integer IDs as nodes, so shortest_paths runs on it directly.
+
+Binary format (native byte order, every section 8 bytes aligned):
+    header: magic b"CSRG0001", number of nodes n, number of edges m, size of the names block (3 int64)
+    offsets: n + 1 int64
+    weights: m float64
+    targets: m int32
+    names: node names converted to strings and encoded in utf-8, separated by newlines
+"""
+
+import heapq
+import mmap
+import struct
+from array import array
+
+from dijkstra import shortest_paths, reconstruct_path
+
+MAGIC = b"CSRG0001"
+HEADER = struct.Struct("8sqqq")
+
+
+class CSRGraph:
+    """A static weighted directed graph in CSR form.
+
+    Attributes:
+        names (list): The name of every node, indexed by ID.
+        offsets (array): Start of the edges of every node, plus the total number of edges at the end.
+        targets (array): Target node ID of every edge.
+        weights (array): Weight of every edge.
+    """
+
+    def __init__(self, names, offsets, targets, weights):
+        self.names = names
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._ids = None
+        self._mmap = None
+
+    @property
+    def ids(self):
+        """Dictionary mapping every node name to its ID, built on first use."""
+        if self._ids is None:
+            self._ids = {name: index for index, name in enumerate(self.names)}
+        return self._ids
+
+    @property
+    def node_count(self):
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def __len__(self):
+        return self.node_count
+
+    def __iter__(self):
+        return iter(range(self.node_count))
+
+    def __contains__(self, node):
+        return isinstance(node, int) and 0 <= node < self.node_count
+
+    def __getitem__(self, node):
+        """Returns the (node, weight) pairs of the edges leaving node."""
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    @classmethod
+    def from_edges(cls, edges, directed=True):
+        """Builds a graph from an iterable of (source name, target name, weight) tuples.
+
+        The edges are consumed one at a time and kept in flat arrays, so the iterable can be a generator over a file
+        much larger than the dictionary representation would allow.
+        """
+        names = []
+        ids = {}
+        sources = array("i")
+        targets = array("i")
+        weights = array("d")
+
+        def intern(name):
+            node = ids.get(name)
+            if node is None:
+                node = ids[name] = len(names)
+                names.append(name)
+            return node
+
+        for source, target, weight in edges:
+            u, v = intern(source), intern(target)
+            sources.append(u)
+            targets.append(v)
+            weights.append(weight)
+            if not directed:
+                sources.append(v)
+                targets.append(u)
+                weights.append(weight)
+
+        graph = cls(names, *_sort_edges(len(names), sources, targets, weights))
+        graph._ids = ids
+        return graph
+
+    @classmethod
+    def from_dict(cls, graph):
+        """Builds a graph from the dictionary representation used in dijkstra.py."""
+        csr = cls.from_edges((u, v, w) for u in graph for v, w in graph[u])
+        # Nodes without incoming or outgoing edges are not in the edge list
+        isolated = [node for node in graph if node not in csr.ids]
+        if isolated:
+            n = csr.node_count
+            csr.names.extend(isolated)
+            csr.offsets.extend([csr.offsets[-1]] * len(isolated))
+            csr.ids.update((name, n + i) for i, name in enumerate(isolated))
+        return csr
+
+    def reverse(self):
+        """Returns a new CSRGraph with every edge reversed, with the same node IDs."""
+        sources = array("i")
+        for u in self:
+            sources.extend([u] * (self.offsets[u + 1] - self.offsets[u]))
+        reverse = CSRGraph(self.names, *_sort_edges(self.node_count, array("i", self.targets), sources,
+                                                    array("d", self.weights)))
+        reverse._ids = self._ids
+        return reverse
+
+    def save(self, path):
+        """Writes the graph to path in the binary format."""
+        names = "\n".join(map(str, self.names)).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.node_count, self.edge_count, len(names)))
+            f.write(memoryview(self.offsets).cast("B"))
+            f.write(memoryview(self.weights).cast("B"))
+            f.write(memoryview(self.targets).cast("B"))
+            if len(self.targets) % 2:  # Padding to keep the names block aligned
+                f.write(bytes(4))
+            f.write(names)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a graph written by save.
+
+        The arrays are views over the mapped file, so loading does not parse anything and pages are read by the
+        operating system only when the search touches them.
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m, names_size = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a CSR graph file")
+
+        view = memoryview(mm)
+        position = HEADER.size
+        offsets = view[position:position + 8 * (n + 1)].cast("q")
+        position += 8 * (n + 1)
+        weights = view[position:position + 8 * m].cast("d")
+        position += 8 * m
+        targets = view[position:position + 4 * m].cast("i")
+        position += 4 * m + 4 * (m % 2)
+        names = bytes(view[position:position + names_size]).decode("utf-8").split("\n") if n else []
+
+        graph = cls(names, offsets, targets, weights)
+        graph._mmap = mm
+        return graph
+
+    def close(self):
+        """Releases the memory map of a graph opened with load."""
+        if self._mmap is not None:
+            self.offsets.release()
+            self.weights.release()
+            self.targets.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def _sort_edges(n, sources, targets, weights):
+    """Counting sort of the edges by source node. Returns the offsets, targets and weights arrays."""
+    offsets = array("q", bytes(8 * (n + 1)))
+    for u in sources:
+        offsets[u + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    position = array("q", offsets[:-1])
+    sorted_targets = array("i", bytes(4 * len(targets)))
+    sorted_weights = array("d", bytes(8 * len(weights)))
+    for u, v, w in zip(sources, targets, weights):
+        p = position[u]
+        sorted_targets[p] = v
+        sorted_weights[p] = w
+        position[u] = p + 1
+    return offsets, sorted_targets, sorted_weights
+
+
+def read_edge_list(path, directed=True, delimiter=None, comment="#"):
+    """Streams an edge-list text file into a CSRGraph.
+
+    Every non-empty line is "source target [weight]", separated by delimiter (any whitespace by default). Missing
+    weights default to 1 and lines starting with comment are skipped.
+    """
+    def edges():
+        with open(path) as f:
+            for line in f:
+                if not line.strip() or line.startswith(comment):
+                    continue
+                fields = line.split(delimiter)
+                weight = float(fields[2]) if len(fields) > 2 else 1.0
+                yield fields[0].strip(), fields[1].strip(), weight
+
+    return CSRGraph.from_edges(edges(), directed=directed)
+
+
+def csr_shortest_paths(graph, source, target=None):
+    """Runs Dijkstra algorithm on a CSRGraph using flat lists instead of dictionaries.
+
+    Attributes:
+        graph (CSRGraph): The graph.
+        source (int): ID of the starting node.
+        target (int): If given, the search stops as soon as this node is settled.
+
+    Returns:
+        A tuple (distances, prev) of lists indexed by node ID, with None for the nodes not reached.
+    """
+    n = graph.node_count
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = [None] * n
+    prev = [None] * n
+    settled = bytearray(n)
+    distances[source] = 0
+    heap = [(0, source)]
+
+    while heap:
+        distance, u = heapq.heappop(heap)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        if u == target:
+            break
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            new_distance = distance + weights[i]
+            if distances[v] is None or new_distance < distances[v]:
+                distances[v] = new_distance
+                prev[v] = u
+                heapq.heappush(heap, (new_distance, v))
+
+    return distances, prev
+
+
+if __name__ == "__main__":
+    from dijkstra import graph as example_graph
+
+    csr = CSRGraph.from_dict(example_graph)
+    print(f"{csr.node_count} nodes, {csr.edge_count} edges")
+
+    source = csr.ids["A"]
+    distances, prev = csr_shortest_paths(csr, source)
+    print({csr.names[i]: d for i, d in enumerate(distances)})
+
+    # The dictionary based implementation accepts the CSR graph as well
+    distances, prev = shortest_paths(csr, source)
+    path = reconstruct_path(prev, source, csr.ids["D"])
+    print(" => ".join(csr.names[node] for node in path))
@@ -1,3 +1,11 @@
+"""An example implementation of Dijkstra algorithm
+
+The next node to visit is taken from a binary heap. When a shorter distance to a node is found, the node is pushed
+again and the old entry is simply skipped when it is popped (lazy deletion), so every step costs O(log V) instead of a
+scan over all the nodes."""
+
+import heapq
+
 # Create a dictionary that represents a graph
 
 graph = {
@@ -8,44 +16,81 @@ graph = {
     "E": [("D", 1)]
 }
 
-# Create a list of unvisited nodes
 
-unvisited_nodes = [node for node in graph]
+def shortest_paths(graph, source, target=None):
+    """Runs Dijkstra algorithm from source.
 
-# Let's pick a starting node
+    Attributes:
+        graph (dict): Maps every node to a list of (node, weight) tuples.
+        source: The starting node.
+        target: If given, the search stops as soon as this node is settled.
 
-starting_node = "A"
+    Returns:
+        A tuple (distances, prev) of dictionaries. Nodes not reached have distance None and prev None. When the
+        search stops at target, only target and the nodes settled before it have their exact distance and prev (so
+        the path to target is exact): the other nodes reached keep a tentative distance and prev, which may be longer
+        than the shortest one.
+    """
+    # Create a dictionary that keeps track of distances
+    distances = {}
+    prev = {}
+    for node in graph:
+        distances[node] = None
+        prev[node] = None
 
-# Create a dictionary that keeps track of distances
+    # Set the distance of the starting node from itself to zero
+    distances[source] = 0
 
-distances = {}
-prev = {}
-for node in graph:
-    distances[node] = None
-    prev[node] = None
+    visited = set()
+    heap = [(0, source)]
 
-# Set the distance of the starting node from itself to zero
+    while heap:
+        distance, current_node = heapq.heappop(heap)
+        if current_node in visited:  # Stale entry, the node was already settled with a shorter distance
+            continue
+        visited.add(current_node)
+        if current_node == target:  # The target is settled, its distance can't change anymore
+            break
 
-distances[starting_node] = 0
+        for node, weight in graph[current_node]:  # Update distances
+            new_distance = distance + weight
+            if distances[node] is None or new_distance < distances[node]:
+                distances[node] = new_distance
+                prev[node] = current_node
+                heapq.heappush(heap, (new_distance, node))
 
-# Define the current node as the starting one
+    return distances, prev
 
-current_node = starting_node
 
-while unvisited_nodes:
-    unvisited_nodes.remove(current_node)  # Remove the node from the list of unvisited nodes
-    for node, distance in graph[current_node]:  # Update distances
-        if distances[node] is None:  # If the node is still not visited, update the distance
-            distances[node] = distances[current_node] + distance
-            prev[node] = current_node
-            continue
-        if distances[current_node] + distance < distances[node]:  # If we found a shorter path, update the distance
-            distances[node] = distances[current_node] + distance
-            prev[node] = current_node
-
-    # Find the unvisited node with minimum distance
-    current_node = min(distances.items(),
-                       key=lambda x: x[1] if (x[1] is not None) and (x[0] in unvisited_nodes) else float("inf"))[0]
-# Print the output
-print(distances)
-print(prev)
+def reverse_graph(graph):
+    """Returns a dictionary graph with every edge of graph reversed."""
+    reverse = {node: [] for node in graph}
+    for node in graph:
+        for neighbor, weight in graph[node]:
+            reverse[neighbor].append((node, weight))
+    return reverse
+
+
+def reconstruct_path(prev, source, target):
+    """Returns the list of nodes from source to target following prev, or None if target was not reached."""
+    path = [target]
+    while path[-1] != source:
+        node = prev[path[-1]]
+        if node is None:
+            return None
+        path.append(node)
+    path.reverse()
+    return path
+
+
+if __name__ == "__main__":
+    # Let's pick a starting node
+    starting_node = "A"
+
+    distances, prev = shortest_paths(graph, starting_node)
+
+    # Print the output
+    print(distances)
+    print(prev)
+    for node in graph:
+        print(f"{node}: {reconstruct_path(prev, starting_node, node)}")
@@ -0,0 +1,171 @@
+"""Shortest paths from one source kept up to date while the edges of the graph change
+
+The distances and the shortest path tree (prev) are computed once with Dijkstra algorithm. After that every update
+only repairs the part of the tree it can affect:
+
+- A new edge or a lower weight on u -> v can only shorten the paths through v, so a Dijkstra search starts from v
+  and stops at the nodes whose distance doesn't improve.
+- A removed edge or a higher weight on u -> v changes nothing unless u -> v is in the tree. If it is, only the
+  subtree below v can get longer: those nodes are reset, seeded with their best edge coming from outside the subtree,
+  and settled again with a Dijkstra search restricted to the subtree.
+"""
+
+import heapq
+
+from dijkstra import graph as example_graph, shortest_paths
+
+
+class DynamicShortestPaths:
+    """Shortest paths from source in a graph whose edges change.
+
+    Attributes:
+        source: The starting node.
+        distances (dict): The distance of every node from source, None if not reachable.
+        prev (dict): The node before every node in its shortest path, None for source and unreachable nodes.
+        last_touched (int): Number of nodes whose distance was recomputed by the last update.
+        total_touched (int): Number of nodes recomputed by all the updates.
+        update_count (int): Number of updates applied.
+    """
+
+    def __init__(self, graph, source):
+        self.source = source
+        # Keep a mutable copy of the graph, with the lightest of parallel edges, and the incoming edges
+        self._out = {node: {} for node in graph}
+        self._in = {node: {} for node in graph}
+        for node in graph:
+            for neighbor, weight in graph[node]:
+                if weight < self._out[node].get(neighbor, float("inf")):
+                    self._out[node][neighbor] = weight
+                    self._in[neighbor][node] = weight
+
+        self.distances, self.prev = shortest_paths(graph, source)
+        self._children = {node: set() for node in graph}
+        for node, parent in self.prev.items():
+            if parent is not None:
+                self._children[parent].add(node)
+
+        self.last_touched = 0
+        self.total_touched = 0
+        self.update_count = 0
+
+    def _add_node(self, node):
+        if node not in self._out:
+            self._out[node] = {}
+            self._in[node] = {}
+            self._children[node] = set()
+            self.distances[node] = None
+            self.prev[node] = None
+
+    def _set_parent(self, node, parent):
+        if self.prev[node] is not None:
+            self._children[self.prev[node]].discard(node)
+        self.prev[node] = parent
+        if parent is not None:
+            self._children[parent].add(node)
+
+    def _count(self, touched):
+        self.last_touched = touched
+        self.total_touched += touched
+        self.update_count += 1
+
+    def set_edge(self, u, v, weight):
+        """Inserts the edge u -> v, or changes its weight if it already exists."""
+        self._add_node(u)
+        self._add_node(v)
+        old_weight = self._out[u].get(v)
+        self._out[u][v] = weight
+        self._in[v][u] = weight
+
+        if old_weight is not None and weight > old_weight:
+            self._count(self._repair_increase(u, v))
+        else:
+            self._count(self._repair_decrease(u, v))
+
+    def remove_edge(self, u, v):
+        """Removes the edge u -> v."""
+        del self._out[u][v]
+        del self._in[v][u]
+        self._count(self._repair_increase(u, v))
+
+    def _repair_decrease(self, u, v):
+        """Propagates a shorter path to v through u -> v. Returns the number of nodes updated."""
+        if self.distances[u] is None:
+            return 0
+        new_distance = self.distances[u] + self._out[u][v]
+        if self.distances[v] is not None and new_distance >= self.distances[v]:
+            return 0
+
+        self.distances[v] = new_distance
+        self._set_parent(v, u)
+        touched = set()
+        heap = [(new_distance, v)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > self.distances[node]:  # Stale entry
+                continue
+            touched.add(node)
+            for neighbor, weight in self._out[node].items():
+                new_distance = distance + weight
+                if self.distances[neighbor] is None or new_distance < self.distances[neighbor]:
+                    self.distances[neighbor] = new_distance
+                    self._set_parent(neighbor, node)
+                    heapq.heappush(heap, (new_distance, neighbor))
+        return len(touched)
+
+    def _repair_increase(self, u, v):
+        """Recomputes the subtree of v after u -> v got longer or was removed. Returns the number of nodes updated."""
+        if self.prev[v] != u:  # Not a tree edge, no shortest path used it
+            return 0
+
+        # Collect the subtree of v and reset it
+        subtree = []
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            subtree.append(node)
+            stack.extend(self._children[node])
+        affected = set(subtree)
+        for node in subtree:
+            self.distances[node] = None
+            self._set_parent(node, None)
+
+        # Best path to every affected node entering the subtree with its last edge
+        heap = []
+        for node in subtree:
+            for parent, weight in self._in[node].items():
+                if parent not in affected and self.distances[parent] is not None:
+                    new_distance = self.distances[parent] + weight
+                    if self.distances[node] is None or new_distance < self.distances[node]:
+                        self.distances[node] = new_distance
+                        self._set_parent(node, parent)
+            if self.distances[node] is not None:
+                heapq.heappush(heap, (self.distances[node], node))
+
+        # Dijkstra restricted to the subtree, the other nodes can't get shorter
+        settled = set()
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node in settled or distance > self.distances[node]:
+                continue
+            settled.add(node)
+            for neighbor, weight in self._out[node].items():
+                if neighbor in affected and neighbor not in settled:
+                    new_distance = distance + weight
+                    if self.distances[neighbor] is None or new_distance < self.distances[neighbor]:
+                        self.distances[neighbor] = new_distance
+                        self._set_parent(neighbor, node)
+                        heapq.heappush(heap, (new_distance, neighbor))
+        return len(subtree)
+
+
+if __name__ == "__main__":
+    tree = DynamicShortestPaths(example_graph, "A")
+    print(tree.distances)
+
+    tree.set_edge("A", "D", 1)
+    print(f"Added A -> D: {tree.distances}, {tree.last_touched} nodes touched")
+    tree.set_edge("C", "B", 10)
+    print(f"C -> B longer: {tree.distances}, {tree.last_touched} nodes touched")
+    tree.remove_edge("A", "D")
+    print(f"Removed A -> D: {tree.distances}, {tree.last_touched} nodes touched")
+    print(tree.prev)
@@ -0,0 +1,254 @@
+"""Landmark based (ALT) point-to-point shortest paths
+
+ALT stands for A*, Landmarks and Triangle inequality. A few landmark nodes are picked once and the exact distances from
+and to every landmark L are stored. For any node v and target t the triangle inequality gives two lower bounds on the
+distance d(v, t):
+
+    d(v, t) >= d(v, L) - d(t, L)
+    d(v, t) >= d(L, t) - d(L, v)
+
+The largest bound over all the landmarks is used as the heuristic of an A* search, which settles far fewer nodes than
+Dijkstra algorithm because it is pulled towards the target. Queries can also run as bidirectional searches, using the
+average of the forward and backward potentials so that both searches stay consistent.
+
+Works on the dictionary graphs of dijkstra.py and on CSRGraph from csrgraph.py.
+"""
+
+import heapq
+import pickle
+from array import array
+from collections import namedtuple
+
+from dijkstra import graph as example_graph, shortest_paths, reverse_graph, reconstruct_path
+
+INFINITY = float("inf")
+
+# distance is None and path is None when target can't be reached. settled counts the nodes taken from the heaps.
+QueryResult = namedtuple("QueryResult", ["distance", "path", "settled"])
+
+
+class ALTIndex:
+    """Landmark distances of a static graph.
+
+    Attributes:
+        graph: The graph, a dictionary or a CSRGraph.
+        reverse: The graph with every edge reversed. Computed with reverse_graph if not given.
+        landmarks (list): The landmark nodes.
+        nodes (list): Every node of the graph, the tables are indexed by the position of the node in this list.
+        from_landmark (list): For every landmark, an array of the distances from the landmark to every node.
+        to_landmark (list): For every landmark, an array of the distances from every node to the landmark.
+    """
+
+    def __init__(self, graph, landmark_count=8, reverse=None, landmarks=None):
+        self.graph = graph
+        self.reverse = reverse if reverse is not None else reverse_graph(graph)
+        self.nodes = list(graph)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.landmarks = []
+        self.from_landmark = []
+        self.to_landmark = []
+
+        if landmarks is None:
+            self._add_farthest_landmarks(landmark_count)
+        else:
+            for landmark in landmarks:
+                self._add_landmark(landmark)
+
+    def _table(self, distances):
+        return array("d", (INFINITY if distances[node] is None else distances[node] for node in self.nodes))
+
+    def _add_landmark(self, landmark, forward=None, backward=None):
+        """Adds a landmark and its tables, from the distances from and to it if they are already computed."""
+        if forward is None:
+            forward = shortest_paths(self.graph, landmark)[0]
+        if backward is None:
+            backward = shortest_paths(self.reverse, landmark)[0]
+        self.landmarks.append(landmark)
+        self.from_landmark.append(self._table(forward))
+        self.to_landmark.append(self._table(backward))
+
+    def _add_farthest_landmarks(self, landmark_count):
+        """Farthest selection: every new landmark is the node farthest from the ones already picked.
+
+        The distances from and to every landmark computed for the selection are also its tables."""
+        if not self.nodes:
+            return
+        picked = set()
+        # Sum of the distances from and to the picked landmarks, nodes not connected to them count as unreachable
+        spread = [0.0] * len(self.nodes)
+        candidate = self.nodes[0]
+        landmark_count = min(landmark_count, len(self.nodes))
+        while len(self.landmarks) < landmark_count:
+            forward = shortest_paths(self.graph, candidate)[0]
+            backward = shortest_paths(self.reverse, candidate)[0]
+            self._add_landmark(candidate, forward, backward)
+            picked.add(candidate)
+            if len(self.landmarks) == landmark_count:  # No next landmark to pick
+                break
+            best = None
+            for i, node in enumerate(self.nodes):
+                if node in picked:
+                    continue
+                if forward[node] is None and backward[node] is None:
+                    continue
+                spread[i] += (forward[node] or 0) + (backward[node] or 0)
+                if best is None or spread[i] > spread[best]:
+                    best = i
+            if best is None:
+                # Every reachable node is already a landmark, start again from a node in another component
+                candidate = next(node for node in self.nodes if node not in picked)
+            else:
+                candidate = self.nodes[best]
+
+    def lower_bound(self, node, target):
+        """Returns a lower bound on the distance from node to target, INFINITY if target can't be reached."""
+        v, t = self.index[node], self.index[target]
+        bound = 0.0
+        for from_l, to_l in zip(self.from_landmark, self.to_landmark):
+            # d(v, t) >= d(v, L) - d(t, L)
+            if to_l[t] < INFINITY:
+                if to_l[v] == INFINITY:  # v can't reach L, but t can: v can't reach t
+                    return INFINITY
+                bound = max(bound, to_l[v] - to_l[t])
+            # d(v, t) >= d(L, t) - d(L, v)
+            if from_l[v] < INFINITY:
+                if from_l[t] == INFINITY:  # L reaches v but not t: v can't reach t
+                    return INFINITY
+                bound = max(bound, from_l[t] - from_l[v])
+        return bound
+
+    def query(self, source, target, method="astar"):
+        """Computes the shortest path from source to target.
+
+        Attributes:
+            source: The starting node.
+            target: The destination node.
+            method (str): astar, bidirectional, or dijkstra for the plain search (to compare settled counts).
+
+        Returns:
+            A QueryResult.
+        """
+        if method == "bidirectional":
+            return self._bidirectional(source, target)
+        if method == "dijkstra":
+            return self._astar(source, target, lambda node: 0.0)
+        return self._astar(source, target, lambda node: self.lower_bound(node, target))
+
+    def _astar(self, source, target, potential):
+        distances = {source: 0}
+        prev = {source: None}
+        settled = set()
+        heap = [(potential(source), source)]
+
+        while heap:
+            _, current_node = heapq.heappop(heap)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+            if current_node == target:
+                return QueryResult(distances[target], reconstruct_path(prev, source, target), len(settled))
+
+            for node, weight in self.graph[current_node]:
+                new_distance = distances[current_node] + weight
+                if node not in distances or new_distance < distances[node]:
+                    estimate = potential(node)
+                    if estimate == INFINITY:  # target can't be reached from node
+                        continue
+                    distances[node] = new_distance
+                    prev[node] = current_node
+                    heapq.heappush(heap, (new_distance + estimate, node))
+
+        return QueryResult(None, None, len(settled))
+
+    def _bidirectional(self, source, target):
+        if source == target:
+            return QueryResult(0, [source], 1)
+
+        cache = {}
+
+        def forward_potential(node):
+            if node not in cache:
+                to_target = self.lower_bound(node, target)
+                from_source = self.lower_bound(source, node)
+                if to_target == INFINITY or from_source == INFINITY:
+                    cache[node] = None
+                else:
+                    cache[node] = (to_target - from_source) / 2
+            return cache[node]
+
+        def backward_potential(node):
+            # The backward potential is the opposite of the forward one
+            potential = forward_potential(node)
+            return None if potential is None else -potential
+
+        if forward_potential(source) is None:  # The landmarks already prove that target can't be reached
+            return QueryResult(None, None, 0)
+
+        graphs = (self.graph, self.reverse)
+        potentials = (forward_potential, backward_potential)
+        distances = ({source: 0}, {target: 0})
+        prev = ({source: None}, {target: None})
+        settled = (set(), set())
+        heaps = ([(potentials[0](source), source)], [(potentials[1](target), target)])
+        best = INFINITY
+        meeting_node = None
+
+        while heaps[0] and heaps[1]:
+            # Keys already include the potentials, which sum to zero, so this is the usual bidirectional stop
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, current_node = heapq.heappop(heaps[side])
+            if current_node in settled[side]:
+                continue
+            settled[side].add(current_node)
+
+            for node, weight in graphs[side][current_node]:
+                new_distance = distances[side][current_node] + weight
+                if node not in distances[side] or new_distance < distances[side][node]:
+                    estimate = potentials[side](node)
+                    if estimate is None:
+                        continue
+                    distances[side][node] = new_distance
+                    prev[side][node] = current_node
+                    heapq.heappush(heaps[side], (new_distance + estimate, node))
+                    if node in distances[1 - side] and new_distance + distances[1 - side][node] < best:
+                        best = new_distance + distances[1 - side][node]
+                        meeting_node = node
+
+        settled_count = len(settled[0]) + len(settled[1])
+        if meeting_node is None:
+            return QueryResult(None, None, settled_count)
+        path = reconstruct_path(prev[0], source, meeting_node)
+        node = prev[1][meeting_node]
+        while node is not None:
+            path.append(node)
+            node = prev[1][node]
+        return QueryResult(best, path, settled_count)
+
+    def save(self, path):
+        """Writes the landmarks and their distance tables to path."""
+        with open(path, "wb") as f:
+            pickle.dump({"nodes": self.nodes, "landmarks": self.landmarks, "from_landmark": self.from_landmark,
+                         "to_landmark": self.to_landmark}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, graph, reverse=None):
+        """Reads an index written by save. graph must be the same graph the index was built on."""
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        index = cls(graph, reverse=reverse, landmarks=[])
+        if index.nodes != data["nodes"]:
+            raise ValueError(f"The index in {path} was built on a different graph")
+        index.landmarks = data["landmarks"]
+        index.from_landmark = data["from_landmark"]
+        index.to_landmark = data["to_landmark"]
+        return index
+
+
+if __name__ == "__main__":
+    index = ALTIndex(example_graph, landmark_count=2)
+    print(f"Landmarks: {index.landmarks}")
+    for method in ("dijkstra", "astar", "bidirectional"):
+        result = index.query("A", "D", method)
+        print(f"{method}: distance {result.distance}, path {result.path}, {result.settled} nodes settled")
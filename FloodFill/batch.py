@@ -0,0 +1,154 @@
+"""Batch flood fill of many seeds across worker threads
+
+A batch is a list of (seed, target, replacement) fills, the seed being a (row, column) cell. The regions are found
+once for the whole batch instead of one fill at a time:
+
+1. The grid is split in tiles, and worker threads label the regions of every tile with labels.py. NumPy releases the
+   GIL in its kernels, so the tiles are labeled in parallel.
+2. The labels of the tiles are made global by adding the number of labels of the tiles before them, and a final
+   union-find joins the labels of the cells of the same color touching across the edges of the tiles.
+3. Every fill picks the region of its seed, and the threads recolor the regions picked, tile by tile.
+
+All the seeds are resolved on the grid as it is before the batch. When several fills pick the same region the last
+one wins. The tiles are numbered in a fixed order and every step only depends on them, so the result is the same for
+any number of threads.
+
+    python batch.py --threads 4
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+from grid import Grid, merge_labels, seeded_region
+from labels import label_regions
+
+
+def _tiles(height, width, tile_size):
+    """Returns the (top, bottom, left, right) bounds of the tiles in row major order, bottom and right excluded."""
+    return [(top, min(top + tile_size, height), left, min(left + tile_size, width))
+            for top in range(0, height, tile_size) for left in range(0, width, tile_size)]
+
+
+def _shifted(length, shift):
+    """Returns the slices pairing the index i of a line with i + shift of the next one."""
+    return slice(max(-shift, 0), length - max(shift, 0)), slice(max(shift, 0), length - max(-shift, 0))
+
+
+def _boundary_pairs(cells, labels, tile_size, connectivity):
+    """Returns the arrays of the labels of the cells of the same color touching across the edges of the tiles."""
+    height, width = cells.shape
+    shifts = (-1, 0, 1) if connectivity == 8 else (0,)
+    firsts, seconds = [], []
+    edges = [(cells[:, column - 1], cells[:, column], labels[:, column - 1], labels[:, column])
+             for column in range(tile_size, width, tile_size)]
+    edges += [(cells[row - 1], cells[row], labels[row - 1], labels[row]) for row in range(tile_size, height, tile_size)]
+    for first_cells, second_cells, first_labels, second_labels in edges:
+        for shift in shifts:
+            first, second = _shifted(len(first_cells), shift)
+            same = first_cells[first] == second_cells[second]
+            firsts.append(first_labels[first][same])
+            seconds.append(second_labels[second][same])
+    if not firsts:
+        return numpy.empty(0, dtype=numpy.int64), numpy.empty(0, dtype=numpy.int64)
+    return numpy.concatenate(firsts), numpy.concatenate(seconds)
+
+
+def fill_batch(grid, fills, connectivity=8, threads=None, tile_size=512):
+    """Applies many fills to a grid, in place.
+
+    Attributes:
+        grid: A Grid, whose colors are mapped to codes with its palette, or a 2-D array of integer codes.
+        fills: List of ((row, column), target color, replacement color).
+        connectivity (int): 4 or 8.
+        threads (int): Number of worker threads, by default the one of ThreadPoolExecutor.
+        tile_size (int): Rows and columns of a tile.
+
+    Returns:
+        The list of the number of cells filled by every fill, 0 for the fills whose region is filled by a later one.
+    """
+    if not isinstance(grid, Grid):
+        grid = Grid(grid)
+    cells = grid.cells
+    height, width = cells.shape
+    resolved = []
+    for index, ((row, column), target_color, replacement_color) in enumerate(fills):
+        if not (0 <= row < height and 0 <= column < width):
+            raise IndexError(f"Fill {index}: cell ({row}, {column}) is outside of the grid")
+        if target_color == replacement_color:
+            raise ValueError(f"Fill {index}: target color is equal to replacement color")
+        if grid.color(row, column) != target_color:
+            raise ValueError(f"Fill {index}: node color is not equal to target color")
+        resolved.append((row, column, grid.code(replacement_color)))
+
+    tiles = _tiles(height, width, tile_size)
+    labels = numpy.empty((height, width), dtype=numpy.int64)
+    with ThreadPoolExecutor(threads) as executor:
+        tile_labels = list(executor.map(
+            lambda bounds: label_regions(cells[bounds[0]:bounds[1], bounds[2]:bounds[3]], connectivity), tiles))
+        count = 0
+        for (top, bottom, left, right), (labeled, tile_count) in zip(tiles, tile_labels):
+            labels[top:bottom, left:right] = labeled + count
+            count += tile_count
+        del tile_labels
+
+        roots = merge_labels(count, *_boundary_pairs(cells, labels, tile_size, connectivity))
+
+        # Fill picking every region, the last one wins
+        winners = {}
+        for index, (row, column, code) in enumerate(resolved):
+            winners[int(roots[labels[row, column]])] = index
+        picked = numpy.zeros(count, dtype=bool)
+        codes = numpy.zeros(count, dtype=cells.dtype)
+        for root, index in winners.items():
+            picked[root] = True
+            codes[root] = resolved[index][2]
+        # Indexed by the labels of the tiles instead of the roots
+        picked, codes = picked[roots], codes[roots]
+
+        def recolor(bounds):
+            top, bottom, left, right = bounds
+            tile = labels[top:bottom, left:right]
+            mask = picked[tile]
+            cells[top:bottom, left:right][mask] = codes[tile[mask]]
+            return numpy.unique(roots[tile[mask]], return_counts=True)
+
+        filled = {}
+        for tile_roots, tile_counts in executor.map(recolor, tiles):
+            for root, tile_count in zip(tile_roots.tolist(), tile_counts.tolist()):
+                filled[root] = filled.get(root, 0) + tile_count
+
+    return [filled[root] if winners[root] == index else 0 for index, root in
+            enumerate(int(roots[labels[row, column]]) for row, column, _ in resolved)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the batch fill of many seeds on a synthetic grid.")
+    parser.add_argument("-t", "--threads", type=int, nargs="+", default=[1, 2, 4], help="Numbers of threads")
+    parser.add_argument("-s", "--seeds", type=int, default=200, help="Number of seeds")
+    parser.add_argument("--tile-size", type=int, default=512, help="Rows and columns of a tile")
+    args = parser.parse_args()
+
+    # A 4000x4000 grid of blocks of 4 colors, the seeds fill regions of color 0 with color 4
+    generator = numpy.random.default_rng(0)
+    cells = numpy.kron(generator.integers(0, 4, (80, 80)), numpy.ones((50, 50), dtype=numpy.int64)).astype(numpy.uint8)
+    background = numpy.argwhere(cells == 0)
+    seeds = [tuple(cell) for cell in background[generator.choice(len(background), args.seeds)].tolist()]
+
+    start_time = time.perf_counter()
+    expected = cells.copy()
+    expected[seeded_region(cells, seeds, 0)] = 4
+    print(f"One scanline fill from all the seeds: {time.perf_counter() - start_time:.3f} seconds")
+
+    for threads in args.threads:
+        grid = Grid(cells.copy())
+        start_time = time.perf_counter()
+        filled = fill_batch(grid, [(seed, 0, 4) for seed in seeds], threads=threads, tile_size=args.tile_size)
+        print(f"{threads} threads: {sum(filled)} cells filled in {time.perf_counter() - start_time:.3f} seconds, "
+              f"same result: {numpy.array_equal(grid.cells, expected)}")
+
+
+if __name__ == "__main__":
+    main()
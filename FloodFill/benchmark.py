@@ -0,0 +1,89 @@
+"""Benchmark of the BFS and scanline modes of the flood fill in grid.py
+
+Every grid is filled from its top left cell with both modes and both connectivities, checking that the regions are
+the same. The grids are synthetic, at the sizes of real images:
+
+    uniform: a single color, the best case for the scanline mode
+    blobs: large random blocks of two colors
+    noise: random cells of two colors, above the percolation threshold, one large region of many short runs
+    serpentine: walls with a gap at alternate ends, one long snake shaped region (smaller, the BFS needs one level
+    per cell of the path)
+
+The noise grids are the worst case of the scanline mode, which goes through the runs one at a time: the default auto
+mode of grid.py gives up on it there and labels the grid instead.
+
+    python benchmark.py --repeat 3
+"""
+
+import argparse
+import time
+
+import numpy
+
+from grid import region
+
+SIZES = [(1080, 1920), (3000, 4000), (4000, 4000)]
+
+
+def uniform(height, width, generator):
+    return numpy.zeros((height, width), dtype=numpy.uint8)
+
+
+def blobs(height, width, generator, block=50):
+    noise = generator.random((height // block + 1, width // block + 1)) < 0.3
+    cells = numpy.kron(noise, numpy.ones((block, block), dtype=bool))[:height, :width].astype(numpy.uint8)
+    cells[0, 0] = 0
+    return cells
+
+
+def noise(height, width, generator, p=0.65):
+    # Color 0 with probability p, above the percolation threshold of 4-connectivity (about 0.593): most of its cells
+    # are in one region crossing the grid. The top row of color 0 joins the top left cell to it.
+    cells = (generator.random((height, width)) >= p).astype(numpy.uint8)
+    cells[0] = 0
+    return cells
+
+
+def serpentine(height, width, generator):
+    cells = numpy.zeros((height, width), dtype=numpy.uint8)
+    cells[1::2] = 1
+    cells[1::4, -1] = 0
+    cells[3::4, 0] = 0
+    return cells
+
+
+def time_region(cells, connectivity, method, repeat):
+    """Returns the region of the top left cell and the best time of repeat runs."""
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        mask = region(cells, 0, 0, connectivity, method)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return mask, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the BFS and scanline flood fills.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Runs of every fill, the best time is kept")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Seed of the random grids")
+    args = parser.parse_args()
+
+    generator = numpy.random.default_rng(args.seed)
+    grids = [(f"{kind.__name__} {height}x{width}", kind(height, width, generator))
+             for kind in (uniform, blobs, noise) for height, width in SIZES]
+    grids.append(("serpentine 256x256", serpentine(256, 256, generator)))
+
+    print(f"{'Grid':<24}{'Conn.':>6}{'Cells':>12}{'BFS (s)':>10}{'Scanline (s)':>14}{'Speedup':>9}")
+    for name, cells in grids:
+        for connectivity in (4, 8):
+            bfs_mask, bfs_time = time_region(cells, connectivity, "bfs", args.repeat)
+            scanline_mask, scanline_time = time_region(cells, connectivity, "scanline", args.repeat)
+            if not numpy.array_equal(bfs_mask, scanline_mask):
+                raise AssertionError(f"The modes give different regions on {name}, {connectivity}-connectivity")
+            print(f"{name:<24}{connectivity:>6}{int(numpy.count_nonzero(bfs_mask)):>12}{bfs_time:>10.3f}"
+                  f"{scanline_time:>14.3f}{bfs_time / scanline_time:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,8 @@ Flood fill, also called seed fill, is an algorithm that determines the area conn
 multi-dimensional array. It is used in the "bucket" fill tool of paint programs to fill connected, similarly-colored
 areas with a different color, and in games such as Go and Minesweeper for determining which pieces are cleared."""
 
-import queue
+from collections import deque
+
 from colorama import init, Fore, Style
 
 # Initialize colorama to color the input and the output
@@ -42,16 +43,22 @@ class Node:
 # A list of Node objects representing the input
 nodes = []
 
+# The nodes indexed by (row, column), to find the neighbors of a node in O(1)
+positions = {}
+
 # A list of positions to check for recursive flood fill with 8 directions
 movements = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
 
 for r, _row in enumerate(my_input):
     for c, _color in enumerate(_row):
         nodes.append(Node(row=r, column=c, color=_color))
+        positions[(r, c)] = nodes[-1]
 
 
 def flood_fill(node, target_color, replacement_color):
-    """Run flood fill algorithm on node"""
+    """Run flood fill algorithm on node
+
+    For large grids use Grid in grid.py, which stores the colors in a NumPy array."""
 
     # Check constraints. If not fulfilled, return.
     if target_color == replacement_color:
@@ -63,23 +70,22 @@ def flood_fill(node, target_color, replacement_color):
     node.color = replacement_color
 
     # Using a FIFO queue
-    q = queue.Queue()
+    q = deque()
 
     # Put the root node in to the queue
-    q.put(node)
+    q.append(node)
 
-    while not q.empty():
-        n = q.get()
+    while q:
+        n = q.popleft()
 
         # Check if, for every movement allowed, the selected node is of the same color.
         # If found, replace the color and put in into the queue.
         for move in movements:
-            selected_node = next(
-                (x for x in nodes if (x.row == (n.row + move[0])) and (x.column == n.column + move[1])), None)
+            selected_node = positions.get((n.row + move[0], n.column + move[1]))
             if selected_node:
                 if selected_node.color == target_color:
                     selected_node.color = replacement_color
-                    q.put(selected_node)
+                    q.append(selected_node)
 
 
 def get_color(letter):
@@ -116,7 +122,7 @@ if __name__ == "__main__":
     # Indexes are zero-based.
     target_row = 9
     target_column = 3
-    target_node = next((x for x in nodes if (x.row == target_row) and (x.column == target_column)), None)
+    target_node = positions.get((target_row, target_column))
 
     if not target_node:
         print(f"Can't find the node in the row {target_row} and column {target_column}")
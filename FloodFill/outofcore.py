@@ -0,0 +1,228 @@
+"""Out-of-core flood fill of raw grid files
+
+The grid is a raw file of uint8 or uint16 cells in row major order, without a header, its shape and type are given
+when opening it. The file is memory-mapped and never read whole: it is split in square tiles, and only a bounded
+number of them is kept in memory in an LRU cache. A changed tile is written back to the file when it leaves the
+cache, and its pages are released.
+
+The fill runs on one tile at a time with the scanline search of grid.py, from all the seeds the tile has received. The
+filled cells on the edges of a tile are the frontier: their neighbors in the next tiles that still hold the target value
+become seeds of these tiles, without duplicates, which are queued and filled in turn, preferring the ones already in the
+cache. The resident memory is the tile cache plus a few arrays of the size of one tile.
+
+    python outofcore.py image.raw --shape 40000 40000 --seed 0 0 --replacement 255
+"""
+
+import argparse
+import mmap
+import os
+import time
+from collections import OrderedDict
+
+import numpy
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from grid import CONNECTIVITY, seeded_region
+
+DTYPES = (numpy.dtype(numpy.uint8), numpy.dtype(numpy.uint16))
+
+
+class TiledGrid:
+    """A memory-mapped raw grid file, read and written through a cache of tiles.
+
+    Attributes:
+        height (int): Number of rows.
+        width (int): Number of columns.
+        dtype: numpy.uint8 or numpy.uint16.
+        tile_size (int): Rows and columns of a tile, smaller on the last row and column of tiles.
+        cache_tiles (int): Maximum number of tiles in memory.
+        loads (int): Number of tiles read from the file.
+        writes (int): Number of tiles written back to the file.
+    """
+
+    def __init__(self, path, shape, dtype=numpy.uint8, tile_size=1024, cache_tiles=16, writable=True):
+        self.height, self.width = shape
+        self.dtype = numpy.dtype(dtype)
+        if self.dtype not in DTYPES:
+            raise ValueError(f"Unsupported cell type {self.dtype}, use uint8 or uint16")
+        if os.path.getsize(path) != self.height * self.width * self.dtype.itemsize:
+            raise ValueError(f"The size of {path} doesn't match a {self.height}x{self.width} grid of {self.dtype}")
+        if tile_size < 1 or cache_tiles < 1:
+            raise ValueError("The tile size and the number of cached tiles must be positive")
+        self.tile_size = tile_size
+        self.cache_tiles = cache_tiles
+        self.writable = writable
+
+        with open(path, "r+b" if writable else "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        self._cells = numpy.frombuffer(self._mmap, dtype=self.dtype).reshape(shape)
+        # (tile row, tile column): [cells, dirty]
+        self._tiles = OrderedDict()
+        self.loads = 0
+        self.writes = 0
+
+    def bounds(self, key):
+        """Returns the first row, last row + 1, first column and last column + 1 of a tile."""
+        tile_row, tile_column = key
+        top, left = tile_row * self.tile_size, tile_column * self.tile_size
+        return top, min(top + self.tile_size, self.height), left, min(left + self.tile_size, self.width)
+
+    def tile(self, key):
+        """Returns the cells of a tile, loading it in the cache. Changes must be marked with mark_dirty."""
+        entry = self._tiles.get(key)
+        if entry is not None:
+            self._tiles.move_to_end(key)
+            return entry[0]
+        while len(self._tiles) >= self.cache_tiles:
+            self._evict(*self._tiles.popitem(last=False))
+        top, bottom, left, right = self.bounds(key)
+        cells = self._cells[top:bottom, left:right].copy()
+        self._tiles[key] = [cells, False]
+        self.loads += 1
+        return cells
+
+    def mark_dirty(self, key):
+        """Marks a tile of the cache as changed, it will be written back to the file."""
+        if not self.writable:
+            raise ValueError("The grid is read only")
+        self._tiles[key][1] = True
+
+    def _evict(self, key, entry):
+        cells, dirty = entry
+        top, bottom, left, right = self.bounds(key)
+        if dirty:
+            self._cells[top:bottom, left:right] = cells
+            self.writes += 1
+        # Release the pages of the rows of the tile, the file keeps the data. The other tiles of these rows in the
+        # cache are copies, they are not affected.
+        if hasattr(mmap, "MADV_DONTNEED"):
+            row_bytes = self.width * self.dtype.itemsize
+            start = top * row_bytes // mmap.PAGESIZE * mmap.PAGESIZE
+            self._mmap.madvise(mmap.MADV_DONTNEED, start, bottom * row_bytes - start)
+
+    def get(self, row, column):
+        """Returns the value of a cell."""
+        if not (0 <= row < self.height and 0 <= column < self.width):
+            raise IndexError(f"Cell ({row}, {column}) is outside of the grid")
+        top, _, left, _ = self.bounds((row // self.tile_size, column // self.tile_size))
+        return int(self.tile((row // self.tile_size, column // self.tile_size))[row - top, column - left])
+
+    def fill(self, row, column, replacement, connectivity=8):
+        """Replaces the value of the region of (row, column) with replacement.
+
+        Returns:
+            The number of cells filled.
+        """
+        target = self.get(row, column)
+        if target == replacement:
+            raise ValueError("Target color is equal to replacement color")
+        if not 0 <= replacement <= numpy.iinfo(self.dtype).max:
+            raise ValueError(f"Replacement color {replacement} doesn't fit in {self.dtype}")
+
+        # Tile: set of seeds in the coordinates of the whole grid
+        pending = OrderedDict({(row // self.tile_size, column // self.tile_size): {(row, column)}})
+        filled = 0
+        while pending:
+            key = next((key for key in pending if key in self._tiles), next(iter(pending)))
+            seeds = pending.pop(key)
+            cells = self.tile(key)
+            top, _, left, _ = self.bounds(key)
+            mask = seeded_region(cells, [(r - top, c - left) for r, c in seeds], target, connectivity)
+            count = int(numpy.count_nonzero(mask))
+            if not count:
+                continue
+            cells[mask] = replacement
+            self.mark_dirty(key)
+            filled += count
+            self._carry_frontier(key, mask, connectivity, target, pending)
+        return filled
+
+    def _carry_frontier(self, key, mask, connectivity, target, pending):
+        """Adds the neighbors of target in the other tiles of the filled cells on the edges of a tile to their pending
+        seeds."""
+        top, bottom, left, right = self.bounds(key)
+        edges = numpy.zeros(mask.shape, dtype=bool)
+        edges[[0, -1], :] = True
+        edges[:, [0, -1]] = True
+        rows, columns = numpy.nonzero(mask & edges)
+        rows += top
+        columns += left
+        neighbors = []
+        for row_move, column_move in CONNECTIVITY[connectivity]:
+            neighbor_rows, neighbor_columns = rows + row_move, columns + column_move
+            outside = ((neighbor_rows < top) | (neighbor_rows >= bottom) | (neighbor_columns < left) |
+                       (neighbor_columns >= right))
+            inside_grid = ((neighbor_rows >= 0) & (neighbor_rows < self.height) & (neighbor_columns >= 0) &
+                           (neighbor_columns < self.width))
+            keep = outside & inside_grid
+            neighbors.append((neighbor_rows[keep], neighbor_columns[keep]))
+        neighbor_rows = numpy.concatenate([neighbor[0] for neighbor in neighbors])
+        neighbor_columns = numpy.concatenate([neighbor[1] for neighbor in neighbors])
+
+        # Only the cells still of target are seeds: a tile already filled isn't loaded again for nothing. The values
+        # are read from the cache, or from the file for the tiles not in the cache, where it is up to date.
+        tile_rows, tile_columns = neighbor_rows // self.tile_size, neighbor_columns // self.tile_size
+        for neighbor_key in set(zip(tile_rows.tolist(), tile_columns.tolist())):
+            selected = (tile_rows == neighbor_key[0]) & (tile_columns == neighbor_key[1])
+            seed_rows, seed_columns = neighbor_rows[selected], neighbor_columns[selected]
+            entry = self._tiles.get(neighbor_key)
+            if entry is None:
+                values = self._cells[seed_rows, seed_columns]
+            else:
+                neighbor_top, _, neighbor_left, _ = self.bounds(neighbor_key)
+                values = entry[0][seed_rows - neighbor_top, seed_columns - neighbor_left]
+            is_target = values == target
+            if numpy.any(is_target):
+                pending.setdefault(neighbor_key, set()).update(
+                    zip(seed_rows[is_target].tolist(), seed_columns[is_target].tolist()))
+
+    def flush(self):
+        """Writes the changed tiles of the cache to the file."""
+        for key, entry in self._tiles.items():
+            cells, dirty = entry
+            if dirty:
+                top, bottom, left, right = self.bounds(key)
+                self._cells[top:bottom, left:right] = cells
+                self.writes += 1
+                entry[1] = False
+        if self.writable:
+            self._mmap.flush()
+
+    def close(self):
+        """Writes the changed tiles and closes the file."""
+        self.flush()
+        self._tiles.clear()
+        del self._cells
+        self._mmap.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flood fills a raw grid file tile by tile.")
+    parser.add_argument("path", help="Raw file of uint8 or uint16 cells in row major order")
+    parser.add_argument("--shape", type=int, nargs=2, required=True, metavar=("ROWS", "COLUMNS"))
+    parser.add_argument("--dtype", choices=("uint8", "uint16"), default="uint8", help="Type of the cells")
+    parser.add_argument("--seed", type=int, nargs=2, required=True, metavar=("ROW", "COLUMN"), help="Seed cell")
+    parser.add_argument("--replacement", type=int, required=True, help="Replacement value")
+    parser.add_argument("--connectivity", type=int, choices=(4, 8), default=8)
+    parser.add_argument("--tile-size", type=int, default=1024, help="Rows and columns of a tile")
+    parser.add_argument("--cache-tiles", type=int, default=16, help="Maximum number of tiles in memory")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    grid = TiledGrid(args.path, args.shape, args.dtype, args.tile_size, args.cache_tiles)
+    try:
+        filled = grid.fill(args.seed[0], args.seed[1], args.replacement, args.connectivity)
+    finally:
+        grid.close()
+    print(f"{filled} cells filled in {time.time() - start_time:.2f} seconds, {grid.loads} tiles loaded, "
+          f"{grid.writes} written")
+    if resource is not None:
+        print(f"Peak resident memory: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,8 +21,15 @@ Given two positive year numbers (with the second one greater than or equal to th
 This is equivalent to asking how many leap years there are in the interval between the two years,
 including the first but excluding the second."""
 
+import random
 
-def leap_count(year):
+import numpy
+
+
+def leap_count_loop(year):
+    """Counts the leap years before year, cycling over the years after the last full 900 years batch.
+
+    Kept to verify leap_count."""
     leaps_base = (year // 900) * 218  # In a batch of 900 years there are 218 leap years
 
     # Do a for cycle to calculate leap years the remaining years
@@ -39,6 +46,39 @@ def leap_count(year):
     return leaps_base
 
 
+def leap_count(year):
+    """Counts the leap years in [0, year).
+
+    (year + 3) // 4 is the number of multiples of 4 below year, (year + 99) // 100 the number of multiples of 100,
+    and (year + 699) // 900 and (year + 299) // 900 the number of years with remainder 200 and 600 when divided by 900.
+    Works the same on Python integers and on NumPy integer arrays."""
+    return (year + 3) // 4 - (year + 99) // 100 + (year + 699) // 900 + (year + 299) // 900
+
+
+def leaps_batch(years1, years2):
+    """Returns the number of leap days between Jan 1 of years1[i] and Jan 1 of years2[i] for every i.
+
+    The years are converted to int64 arrays and counted without Python loops. Years too large for int64 are kept as
+    Python integers in object arrays, slower but exact."""
+    try:
+        years1 = numpy.asarray(years1, dtype=numpy.int64)
+        years2 = numpy.asarray(years2, dtype=numpy.int64)
+        # Keep room for the additions in leap_count
+        if years1.size and max(numpy.abs(years1).max(), numpy.abs(years2).max()) > 2 ** 62:
+            raise OverflowError
+    except OverflowError:
+        years1 = numpy.asarray(years1, dtype=object)
+        years2 = numpy.asarray(years2, dtype=object)
+    return leap_count(years2) - leap_count(years1)
+
+
+def cross_check(trials=10000, max_year=10 ** 6, seed=None):
+    """Compares leap_count with leap_count_loop on random years, returns the years where they differ."""
+    generator = random.Random(seed)
+    years = [generator.randrange(max_year) for _ in range(trials)] + list(range(1801))
+    return [year for year in years if leap_count(year) != leap_count_loop(year)]
+
+
 def leaps(year1, year2):
     if not year2 > year1:
         print(f"{year2} is not greater than {year1}.")
@@ -47,4 +87,17 @@ def leaps(year1, year2):
     print(value)
 
 
-leaps(123456789101112, 1314151617181920)
+if __name__ == "__main__":
+    leaps(2016, 2017)
+    leaps(2019, 2020)
+    leaps(1900, 1901)
+    leaps(2000, 2001)
+    leaps(2800, 2801)
+    leaps(1234, 5678)
+    leaps(123456, 7891011)
+    leaps(123456789101112, 1314151617181920)
+
+    print(leaps_batch([2016, 2019, 1234, 123456], [2017, 2020, 5678, 7891011]))
+    print(leaps_batch([123456789101112, 2000], [1314151617181920, 2001]))
+    print(leaps_batch([10 ** 20], [10 ** 21]))
+    print(f"Differences with the loop: {cross_check(seed=0)}")
@@ -0,0 +1,165 @@
+"""Date arithmetic in the Revised Julian Calendar
+
+Dates are converted to ordinal day numbers, counted like datetime.date.toordinal: Jan 1 of year 1 of the Gregorian
+calendar is day 1. The two calendars agree on every date from March 1600 to February 2800, so Revised Julian dates
+share the same numbering.
+
+Every function takes NumPy arrays (or scalars) and returns arrays, without Python loops over the elements:
+
+    ordinals = rj_to_ordinal(years, months, days)
+    years, months, days = ordinal_to_gregorian(ordinals)
+    weekdays = day_of_week(ordinals)
+
+The number of days before a year comes from the closed form leap_count of leaps.py. The inverse conversion estimates
+the year from the average year length and corrects it by at most a couple of years.
+"""
+
+import datetime
+import sys
+import time
+
+import numpy
+
+from leaps import leap_count as rj_leap_count
+
+# Days before the first day of every month, in common and in leap years
+DAYS_BEFORE_MONTH = numpy.array([0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365])
+DAYS_BEFORE_MONTH_LEAP = numpy.array([0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335, 366])
+
+# datetime64[D] counts days from 1970-01-01
+UNIX_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def gregorian_leap_count(year):
+    """Counts the Gregorian leap years in [0, year)."""
+    return (year + 3) // 4 - (year + 99) // 100 + (year + 399) // 400
+
+
+def is_leap_rj(year):
+    year = numpy.asarray(year)
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 900 == 200) | (year % 900 == 600))
+
+
+def is_leap_gregorian(year):
+    year = numpy.asarray(year)
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def _days_before_year(year, leap_count):
+    """Days from Jan 1 of year 1 to Jan 1 of year."""
+    return 365 * (year - 1) + leap_count(year) - leap_count(1)
+
+
+def _to_ordinal(years, months, days, leap_count, is_leap):
+    years = numpy.asarray(years, dtype=numpy.int64)
+    months = numpy.asarray(months, dtype=numpy.int64)
+    days = numpy.asarray(days, dtype=numpy.int64)
+    if numpy.any((months < 1) | (months > 12)):
+        raise ValueError("Months must be in 1..12")
+    leap = is_leap(years)
+    month_index = months - 1
+    days_before_month = numpy.where(leap, DAYS_BEFORE_MONTH_LEAP[month_index], DAYS_BEFORE_MONTH[month_index])
+    month_length = numpy.where(leap, DAYS_BEFORE_MONTH_LEAP[months], DAYS_BEFORE_MONTH[months]) - days_before_month
+    if numpy.any((days < 1) | (days > month_length)):
+        raise ValueError("Days out of range for their month")
+    return _days_before_year(years, leap_count) + days_before_month + days
+
+
+def _from_ordinal(ordinals, leap_count, is_leap, cycle_years, cycle_days):
+    ordinals = numpy.asarray(ordinals, dtype=numpy.int64)
+    # Estimate the year with the average year length, then fix it
+    years = (ordinals - 1) * cycle_years // cycle_days + 1
+    while True:
+        too_late = _days_before_year(years, leap_count) >= ordinals
+        too_early = _days_before_year(years + 1, leap_count) < ordinals
+        if not (numpy.any(too_late) or numpy.any(too_early)):
+            break
+        years = years - too_late + too_early
+
+    day_of_year = ordinals - _days_before_year(years, leap_count) - 1  # Zero based
+    leap = is_leap(years)
+    months = numpy.where(leap,
+                         numpy.searchsorted(DAYS_BEFORE_MONTH_LEAP, day_of_year, side="right"),
+                         numpy.searchsorted(DAYS_BEFORE_MONTH, day_of_year, side="right"))
+    days = day_of_year - numpy.where(leap, DAYS_BEFORE_MONTH_LEAP[months - 1], DAYS_BEFORE_MONTH[months - 1]) + 1
+    return years, months, days
+
+
+def rj_to_ordinal(years, months, days):
+    """Converts Revised Julian dates to ordinal day numbers."""
+    return _to_ordinal(years, months, days, rj_leap_count, is_leap_rj)
+
+
+def ordinal_to_rj(ordinals):
+    """Converts ordinal day numbers to Revised Julian (years, months, days)."""
+    return _from_ordinal(ordinals, rj_leap_count, is_leap_rj, 900, 900 * 365 + 218)
+
+
+def gregorian_to_ordinal(years, months, days):
+    """Converts Gregorian dates to ordinal day numbers, the same as datetime.date.toordinal."""
+    return _to_ordinal(years, months, days, gregorian_leap_count, is_leap_gregorian)
+
+
+def ordinal_to_gregorian(ordinals):
+    """Converts ordinal day numbers to Gregorian (years, months, days)."""
+    return _from_ordinal(ordinals, gregorian_leap_count, is_leap_gregorian, 400, 400 * 365 + 97)
+
+
+def rj_to_gregorian(years, months, days):
+    return ordinal_to_gregorian(rj_to_ordinal(years, months, days))
+
+
+def gregorian_to_rj(years, months, days):
+    return ordinal_to_rj(gregorian_to_ordinal(years, months, days))
+
+
+def datetime64_to_ordinal(dates):
+    """Converts a datetime64 array (Gregorian dates) to ordinal day numbers."""
+    return numpy.asarray(dates, dtype="datetime64[D]").astype(numpy.int64) + UNIX_EPOCH_ORDINAL
+
+
+def ordinal_to_datetime64(ordinals):
+    """Converts ordinal day numbers to a datetime64[D] array."""
+    return (numpy.asarray(ordinals, dtype=numpy.int64) - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def day_of_week(ordinals):
+    """Returns the day of the week, Monday is 0 and Sunday is 6 like datetime.date.weekday."""
+    return (numpy.asarray(ordinals, dtype=numpy.int64) + 6) % 7
+
+
+def days_between_rj(years1, months1, days1, years2, months2, days2):
+    """Returns the number of days from the first Revised Julian dates to the second ones."""
+    return rj_to_ordinal(years2, months2, days2) - rj_to_ordinal(years1, months1, days1)
+
+
+def benchmark(rows=10 ** 7, seed=0):
+    """Times the conversions on rows random dates, prints conversions per second."""
+    generator = numpy.random.default_rng(seed)
+    ordinals = generator.integers(1, 10 ** 6, rows, dtype=numpy.int64)
+    print(f"Benchmark on {rows} rows")
+
+    def timed(name, function, *args):
+        start_time = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start_time
+        print(f"{name}: {seconds:.2f} seconds, {rows / seconds:,.0f} conversions per second")
+        return result
+
+    years, months, days = timed("ordinal -> Revised Julian", ordinal_to_rj, ordinals)
+    back = timed("Revised Julian -> ordinal", rj_to_ordinal, years, months, days)
+    assert numpy.array_equal(back, ordinals)
+    timed("Revised Julian -> Gregorian", rj_to_gregorian, years, months, days)
+    timed("day of week", day_of_week, ordinals)
+
+
+if __name__ == "__main__":
+    # The calendars agree in this period
+    print(rj_to_gregorian(2019, 3, 13))
+    # And drift apart after 2800: the Gregorian calendar has Feb 29 2800, the Revised Julian one doesn't
+    print(rj_to_gregorian([2800, 2800], [2, 3], [28, 1]))
+    print(f"Weekday of 2019-03-13: {day_of_week(rj_to_ordinal(2019, 3, 13))}")
+    print(f"Days between 2000-01-01 and 2100-01-01: {days_between_rj(2000, 1, 1, 2100, 1, 1)}")
+    print(ordinal_to_datetime64(gregorian_to_ordinal([1970, 2024], [1, 2], [1, 29])))
+
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7)
@@ -1,5 +1,4 @@
-import itertools
-import math
+from maximize import max_residue, parse_cases, validate
 
 """Maximize It!
 
@@ -53,13 +52,8 @@ sample_input = """3 1000
 3 7 8 9
 5 5 7 8 9 10"""
 
-# Get input from sample_input
-# map applies a function to all the items in a list
-K, M = map(int, sample_input.split("\n")[0].split(" "))
-my_input = []
-for line in sample_input.split("\n")[1:]:
-    numbers = list(map(int, line.split(" ")))
-    my_input.append(numbers)
+# Get input from sample_input, the Ni in front of every list is dropped
+K, M, my_input = next(parse_cases(sample_input.split("\n")))
 
 print(f"K = {K}")
 print(f"M = {M}")
@@ -75,37 +69,14 @@ def s(args):
     return sum(to_sum) % M
 
 
-def magnitude(x):
-    return int(math.log10(x))
-
-
 # Validate the input checking the constraints
-# First constraint 1≤K≤7
-if K not in range(1, 8):
-    print("\n\nThe value of K is not in the range 1-7")
-    exit()
-
-# Second constraint 1≤M≤1000
-if M not in range(1, 1001):
-    print("\n\nThe value of M is not in the range 1-1000")
+# The residue solver in maximize.py doesn't need the upper bounds on K and Ni
+error = validate(K, M, my_input, max_m=1000)
+if error is not None:
+    print(f"\n\n{error}")
     exit()
 
-# Third constraint 1≤Ni≤7
-for index, _list in enumerate(my_input):
-    if len(_list) not in range(1, 8):
-        print(f"\n\nThe list {index + 1} is not in range 1-7")
-        exit()
-
-    # Fourth constraint 1≤Magnitude of elements in list≤9
-    for e in _list:
-        if magnitude(e) not in range(0, 10):
-            print(f"\n\nElement {e} not in range 1-10^9")
-            exit()
-
 if __name__ == "__main__":
-    results = []
-    for element in itertools.product(*my_input):
-        elements_as_list = list(element)
-        results.append(s(elements_as_list))
-    maximum = max(results)
-    print(f"\n\nThe result is: {maximum}\n\n")
+    maximum, picked = max_residue(my_input, M, f, reconstruct=True)
+    print(f"\n\nThe result is: {maximum}")
+    print(f"Picked elements: {picked}, S = {s(picked)}\n\n")
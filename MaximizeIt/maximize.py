@@ -0,0 +1,172 @@
+"""Dynamic programming solver for Maximize It!
+
+Only the sum modulo M matters, so instead of trying every combination of elements the solver keeps the set of
+residues that can be reached after picking one element from each of the first lists. With the residues stored as a
+boolean NumPy array, adding a list is one rotation of the array per distinct f(x) % M, so the whole problem costs
+O(K * N * M) instead of the N^K combinations.
+
+The sets of every step are kept to reconstruct which element was picked from each list.
+
+f can be any function that works on NumPy arrays, it is applied to a whole list at a time, as an object array of
+Python integers so that its values never overflow. Many test cases, in the HackerRank input format and one after the
+other, can be read from a file or stdin and solved across a pool of worker processes:
+
+    python maximize.py cases.txt --processes 4
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import sys
+from collections import deque
+
+import numpy
+
+
+def square(x):
+    return x * x
+
+
+def f_mod(_list, m, f=square):
+    """Returns the int64 array of f(x) % m for the elements x of _list.
+
+    f is applied to an object array of Python integers, so it is exact for any f: it only runs on the N elements of
+    the list, and the residues below m are then cast to int64."""
+    return numpy.mod(f(numpy.asarray(_list, dtype=object)), m).astype(numpy.int64)
+
+
+def residues(_list, m, f=square):
+    """Returns the distinct values of f(x) % m for the elements x of _list."""
+    return numpy.unique(f_mod(_list, m, f))
+
+
+def reachable_residues(lists, m, f=square):
+    """Returns the list of boolean arrays of the residues reachable after 0, 1, ..., K lists."""
+    reachable = numpy.zeros(m, dtype=bool)
+    reachable[0] = True
+    steps = [reachable]
+    for _list in lists:
+        new_reachable = numpy.zeros(m, dtype=bool)
+        for residue in residues(_list, m, f):
+            new_reachable |= numpy.roll(reachable, residue)
+        reachable = new_reachable
+        steps.append(reachable)
+    return steps
+
+
+def max_residue(lists, m, f=square, reconstruct=False):
+    """Returns the maximum of (f(X1) + ... + f(Xk)) % m picking one element Xi from every list.
+
+    Attributes:
+        lists (list): The K lists of integers.
+        m (int): The modulo M.
+        f: The function applied to the elements, it must work on NumPy object arrays of integers.
+        reconstruct (bool): Also return the element picked from every list.
+
+    Returns:
+        Smax, or the tuple (Smax, picked elements) if reconstruct is True.
+    """
+    steps = reachable_residues(lists, m, f)
+    s_max = int(numpy.flatnonzero(steps[-1]).max())
+    if not reconstruct:
+        return s_max
+
+    # Walk back from the last list: pick an element whose residue leads to a reachable sum of the previous lists
+    picked = []
+    residue = s_max
+    for index in range(len(lists) - 1, -1, -1):
+        previous = numpy.mod(residue - f_mod(lists[index], m, f), m)
+        choice = int(numpy.flatnonzero(steps[index][previous])[0])
+        picked.append(int(lists[index][choice]))
+        residue = int(previous[choice])
+    picked.reverse()
+    return s_max, picked
+
+
+def validate(k, m, lists, max_k=None, max_n=None, max_m=None):
+    """Returns an error message if the case breaks the constraints, None otherwise.
+
+    The residue solver only needs non-empty lists and a positive M, the HackerRank limits on K, Ni and M can be
+    checked with max_k, max_n and max_m."""
+    if k < 1 or k != len(lists) or (max_k is not None and k > max_k):
+        return f"The value of K is not valid: {k}"
+    if m < 1 or (max_m is not None and m > max_m):
+        return f"The value of M is not valid: {m}"
+    for index, _list in enumerate(lists):
+        if len(_list) < 1 or (max_n is not None and len(_list) > max_n):
+            return f"The size of list {index + 1} is not valid: {len(_list)}"
+        if min(_list) < 1 or max(_list) > 10 ** 9:
+            return f"An element of list {index + 1} is not in range 1-10^9"
+    return None
+
+
+def parse_cases(lines):
+    """Yields the (K, M, lists) test cases of an input in the HackerRank format.
+
+    The input can hold many test cases one after the other. lines can be a file or any iterable of lines, it is read
+    one line at a time. The Ni in front of every list is removed."""
+    lines = (line for line in lines if line.strip())
+    for header in lines:
+        k, m = map(int, header.split())
+        lists = []
+        for line in itertools.islice(lines, k):
+            numbers = list(map(int, line.split()))
+            lists.append(numbers[1:numbers[0] + 1])
+        if len(lists) != k:
+            raise ValueError(f"Expected {k} lists, the input ended after {len(lists)}")
+        yield k, m, lists
+
+
+def _solve_case(case, f):
+    k, m, lists = case
+    error = validate(k, m, lists)
+    if error is not None:
+        return error
+    return max_residue(lists, m, f)
+
+
+def _solve_chunk(chunk, f):
+    return [_solve_case(case, f) for case in chunk]
+
+
+def solve_cases(cases, f=square, processes=None, chunk_size=64):
+    """Solves many (K, M, lists) cases, yielding Smax (or an error message) for each of them in the same order.
+
+    The cases are sent in chunks to a pool of worker processes, with a bounded number of chunks in flight, so cases
+    can come from a generator like parse_cases over a large file. f must be a module level function to be sent to
+    the workers. With processes=1 everything runs in this process."""
+    cases = iter(cases)
+    chunks = iter(lambda: list(itertools.islice(cases, chunk_size)), [])
+    if processes == 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk, f)
+        return
+
+    with multiprocessing.Pool(processes) as pool:
+        max_pending = 2 * (processes or multiprocessing.cpu_count())
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_solve_chunk, (chunk, f)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solves Maximize It! test cases, one after the other.")
+    parser.add_argument("input", nargs="?", default="-", help="File with the test cases, - for stdin")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="Worker processes, default one per CPU")
+    args = parser.parse_args()
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        for result in solve_cases(parse_cases(input_file), processes=args.processes):
+            print(result)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+
+
+if __name__ == "__main__":
+    main()
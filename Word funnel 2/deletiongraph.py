@@ -0,0 +1,163 @@
+"""Precomputed deletion graph of a lexicon for word funnel queries
+
+For every word of the lexicon the IDs of its children, the words obtained by removing one letter, are computed once
+and stored in CSR form: the children of word i are targets[offsets[i]:offsets[i + 1]]. The words obtained by removing
+two letters can be stored the same way, for the variants of the challenge that allow it.
+
+The graph is written to a binary file and memory-mapped, so a query walks integer arrays instead of building and
+looking up strings, and starting up costs only opening the file.
+
+Binary format (native byte order):
+    header: magic b"DELG0001", number of words n, number of one letter edges m1, of two letters edges m2 (int64)
+    offsets of the one letter deletions: n + 1 int64
+    offsets of the two letters deletions: n + 1 int64
+    targets of the one letter deletions: m1 int32
+    targets of the two letters deletions: m2 int32
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from lexicon import Lexicon
+
+MAGIC = b"DELG0001"
+HEADER = struct.Struct("8sqqq")
+
+
+def _children_ids(word, ids, letters):
+    """Returns the sorted distinct IDs of the words obtained by removing letters letters from word."""
+    children = {word}
+    for _ in range(letters):
+        children = {child[:index] + child[index + 1:] for child in children for index in range(len(child))}
+    return sorted(ids[child] for child in children if child in ids)
+
+
+def build(lexicon, path, two_letters=False):
+    """Computes the deletion graph of lexicon and writes it to path."""
+    ids = {word: index for index, word in enumerate(lexicon)}
+    adjacency = []
+    for letters in (1, 2) if two_letters else (1,):
+        offsets = array("q", [0])
+        targets = array("i")
+        for word in ids:
+            targets.extend(_children_ids(word, ids, letters))
+            offsets.append(len(targets))
+        adjacency.append((offsets, targets))
+    if not two_letters:
+        adjacency.append((array("q", [0]) * (len(ids) + 1), array("i")))
+
+    (offsets1, targets1), (offsets2, targets2) = adjacency
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(ids), len(targets1), len(targets2)))
+        for data in (offsets1, offsets2, targets1, targets2):
+            f.write(data.tobytes())
+    os.replace(temporary_path, path)
+
+
+class DeletionGraph:
+    """A memory-mapped deletion graph, with the lexicon it was built from.
+
+    Attributes:
+        lexicon (Lexicon): The words, graph nodes are their IDs.
+    """
+
+    def __init__(self, path, lexicon):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m1, m2 = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a deletion graph")
+        if n != len(lexicon):
+            raise ValueError(f"{path} was built from a different lexicon")
+        self.lexicon = lexicon
+
+        view = memoryview(self._mmap)
+        position = HEADER.size
+        self._offsets = []
+        for _ in range(2):
+            self._offsets.append(view[position:position + 8 * (n + 1)].cast("q"))
+            position += 8 * (n + 1)
+        self._targets = []
+        for m in (m1, m2):
+            self._targets.append(view[position:position + 4 * m].cast("i"))
+            position += 4 * m
+        self.has_two_letters = m2 > 0
+        self._lengths = {}
+
+    @classmethod
+    def load(cls, word_list="enable1.txt", two_letters=False):
+        """Opens the graph of a word list, building it first if the file (word_list + ".deletions") is missing."""
+        lexicon = Lexicon.load(word_list)
+        path = word_list + (".deletions2" if two_letters else ".deletions")
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(word_list):
+            build(lexicon, path, two_letters)
+        return cls(path, lexicon)
+
+    def children(self, index, letters=1):
+        """Returns the IDs of the words obtained by removing letters letters (1 or 2) from word index."""
+        offsets = self._offsets[letters - 1]
+        return self._targets[letters - 1][offsets[index]:offsets[index + 1]]
+
+    def funnel_length(self, index, letters=1):
+        """Returns the length of the longest funnel starting from word index, memoized across queries."""
+        lengths = self._lengths.setdefault(letters, {})
+        # Depth first on an explicit stack: a word is solved when all of its children are
+        stack = [index]
+        while stack:
+            node = stack[-1]
+            if node in lengths:
+                stack.pop()
+                continue
+            pending = [child for child in self.children(node, letters) if child not in lengths]
+            if pending:
+                stack.extend(pending)
+                continue
+            lengths[node] = 1 + max((lengths[child] for child in self.children(node, letters)), default=0)
+            stack.pop()
+        return lengths[index]
+
+    def funnel(self, word, letters=1):
+        """Returns one of the longest funnels starting from word as a list of words, None if word is unknown."""
+        index = self.lexicon.index(word)
+        if index is None:
+            return None
+        funnel = [index]
+        while True:
+            children = self.children(funnel[-1], letters)
+            if not len(children):
+                break
+            funnel.append(max(children, key=lambda child: self.funnel_length(child, letters)))
+        return [self.lexicon[i] for i in funnel]
+
+    def close(self):
+        for data in self._offsets + self._targets:
+            data.release()
+        self._mmap.close()
+
+
+if __name__ == "__main__":
+    two_letters = "--two-letters" in sys.argv
+    if not os.path.exists("enable1.txt.deletions2" if two_letters else "enable1.txt.deletions"):
+        start_time = time.perf_counter()
+        graph = DeletionGraph.load(two_letters=two_letters)
+        print(f"Graph built in {time.perf_counter() - start_time:.2f} seconds")
+        graph.close()
+
+    # Cold start: open the lexicon and the graph and answer one query
+    start_time = time.perf_counter()
+    graph = DeletionGraph.load(two_letters=two_letters)
+    funnel = graph.funnel("princesses")
+    print(f"Cold start query: {(time.perf_counter() - start_time) * 1000:.2f} ms, {' => '.join(funnel)}")
+
+    for word in ("gnash", "turntables", "implosive", "programmer"):
+        start_time = time.perf_counter()
+        funnel = graph.funnel(word)
+        print(f"{(time.perf_counter() - start_time) * 1000:.2f} ms, {len(funnel)}: {' => '.join(funnel)}")
+
+    if two_letters:
+        print(f"Removing two letters at every step: {' => '.join(graph.funnel('implosive', letters=2))}")
@@ -0,0 +1,44 @@
+"""Command line interface of wordfunnel2
+
+Prints the longest funnels of the words given, or runs the examples of the challenge without arguments:
+
+    python funnel.py gnash princesses --algorithm dfs
+    python funnel.py princesses --deduplicated
+    python funnel.py --find10 --word-list enable1.txt
+"""
+
+import argparse
+
+import wordfunnel2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Finds the longest word funnels of words.")
+    parser.add_argument("words", nargs="*", help="Words to search, the examples of the challenge if none")
+    parser.add_argument("-a", "--algorithm", choices=("bfs", "dfs"), default="bfs", help="Search algorithm")
+    parser.add_argument("-w", "--word-list", default=None, help="Word list, one word per line")
+    parser.add_argument("-d", "--deduplicated", action="store_true",
+                        help="Use the deduplicated search, which also prints the peak frontier size")
+    parser.add_argument("--find10", action="store_true", help="Find the word with a funnel of length 10")
+    args = parser.parse_args(argv)
+
+    if args.word_list is not None:
+        wordfunnel2.set_word_list(args.word_list)
+    if not args.words and not args.find10:
+        wordfunnel2.demo()
+        return
+
+    for word in args.words:
+        if args.deduplicated:
+            funnels, peak_frontier = wordfunnel2.search_longest(word, args.algorithm)
+            print(f"{word}: {len(funnels)} longest funnels of length {len(funnels[0])}, peak frontier {peak_frontier}")
+            for funnel in funnels:
+                print(" => ".join(funnel))
+        else:
+            wordfunnel2.funnel2(word, args.algorithm)
+    if args.find10:
+        wordfunnel2.find10(args.algorithm)
+
+
+if __name__ == "__main__":
+    main()
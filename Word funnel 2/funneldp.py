@@ -0,0 +1,91 @@
+"""Longest word funnel of every word of the lexicon in one pass
+
+The longest funnel starting from a word is the word followed by the longest funnel of one of its children, the words
+obtained by removing one letter. Children are always shorter, so processing the words by increasing length every
+child is already solved when its parents are reached. Every word is expanded only once, instead of rebuilding the
+whole tree below it for every search, and the whole enable1 list takes a few seconds.
+
+After the pass the length of any word is a table lookup, and following the best child of every word gives one of its
+longest funnels.
+"""
+
+import time
+from array import array
+
+from lexicon import Lexicon
+
+
+def deletions(word):
+    """Yields the distinct words obtained by removing one letter of word."""
+    previous = None
+    for index in range(len(word)):
+        child = word[:index] + word[index + 1:]
+        if child != previous:  # Removing any letter of a run of equal letters gives the same word
+            yield child
+        previous = child
+
+
+class FunnelTable:
+    """Longest funnel length of every word of a word list.
+
+    Attributes:
+        words (list): The words, indexed by ID.
+        lengths (array): The length of the longest funnel starting from every word.
+        best_child (array): The ID of the next word in one of the longest funnels, -1 when the funnel ends.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.ids = {word: index for index, word in enumerate(self.words)}
+        n = len(self.words)
+        self.lengths = array("B", bytes(n))
+        self.best_child = array("i", [-1]) * n
+
+        for index in sorted(range(n), key=lambda i: len(self.words[i])):
+            best_length, best_child = 1, -1
+            for child in deletions(self.words[index]):
+                child_index = self.ids.get(child)
+                if child_index is not None and self.lengths[child_index] + 1 > best_length:
+                    best_length, best_child = self.lengths[child_index] + 1, child_index
+            self.lengths[index] = best_length
+            self.best_child[index] = best_child
+
+    def length(self, word):
+        """Returns the length of the longest funnel starting from word, which doesn't need to be in the table."""
+        index = self.ids.get(word)
+        if index is not None:
+            return self.lengths[index]
+        return 1 + max((self.lengths[self.ids[child]] for child in deletions(word) if child in self.ids), default=0)
+
+    def funnel(self, word):
+        """Returns one of the longest funnels starting from word, as a list of words."""
+        index = self.ids.get(word)
+        if index is None:
+            children = [self.ids[child] for child in deletions(word) if child in self.ids]
+            if not children:
+                return [word]
+            return [word] + self.funnel(self.words[max(children, key=lambda i: self.lengths[i])])
+
+        funnel = [word]
+        index = self.best_child[index]
+        while index != -1:
+            funnel.append(self.words[index])
+            index = self.best_child[index]
+        return funnel
+
+    def longer_than(self, minimum_length):
+        """Returns the words whose longest funnel has at least minimum_length words."""
+        return [word for word, length in zip(self.words, self.lengths) if length >= minimum_length]
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    table = FunnelTable(Lexicon.load("enable1.txt"))
+    print(f"Funnel lengths of {len(table.words)} words computed in {time.time() - start_time:.2f} seconds")
+
+    for word in ("gnash", "princesses", "turntables", "implosive", "programmer"):
+        print(f"{word}: {table.length(word)}, {' => '.join(table.funnel(word))}")
+
+    # Optional bonus 1
+    for word in table.longer_than(10):
+        print(f"The word {word} funnel has length {table.length(word)}: {' => '.join(table.funnel(word))}")
@@ -0,0 +1,147 @@
+"""A word list with O(1) membership and a binary cache on disk
+
+The words are sorted and numbered, and stored in one buffer laid out like the cache file:
+
+    header: magic b"LEXC0001", number of words n, number of hash slots (a power of 2), size of the words block (int64)
+    offsets: n + 1 int64, the word i is words[offsets[i]:offsets[i + 1]]
+    slots: open addressing hash table of uint32, 0 for an empty slot or the ID of a word plus 1
+    words: the words encoded in utf-8, one after the other
+
+A word is found by hashing it with CRC32 and probing the slots, comparing the bytes directly in the buffer. When the
+lexicon comes from the cache, the buffer is the memory-mapped file: nothing is parsed at startup and the pages are
+shared between the processes that open it.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from array import array
+
+MAGIC = b"LEXC0001"
+HEADER = struct.Struct("8sqqq")
+CACHE_EXTENSION = ".lexicon"
+
+
+def _encode(words):
+    """Returns the buffer of a sorted list of distinct words."""
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = array("q", [0])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+
+    table_size = 2
+    while table_size < 2 * len(encoded):  # Load factor at most 0.5
+        table_size *= 2
+    mask = table_size - 1
+    slots = array("I", bytes(4 * table_size))
+    for index, word in enumerate(encoded):
+        slot = zlib.crc32(word) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = index + 1
+
+    blob = b"".join(encoded)
+    return b"".join([HEADER.pack(MAGIC, len(encoded), table_size, len(blob)), offsets.tobytes(), slots.tobytes(),
+                     blob])
+
+
+class Lexicon:
+    """A sorted set of words, each with an integer ID.
+
+    Attributes:
+        buffer: The bytes or the memory map holding the lexicon.
+    """
+
+    def __init__(self, buffer, source=None):
+        magic, n, table_size, blob_size = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{source or 'The buffer'} is not a lexicon")
+        self.buffer = buffer
+        view = memoryview(buffer)
+        position = HEADER.size
+        self._offsets = view[position:position + 8 * (n + 1)].cast("q")
+        position += 8 * (n + 1)
+        self._slots = view[position:position + 4 * table_size].cast("I")
+        position += 4 * table_size
+        self._blob = view[position:position + blob_size]
+        self._mask = table_size - 1
+        self._length = n
+
+    @classmethod
+    def from_words(cls, words):
+        """Builds a lexicon from an iterable of words."""
+        return cls(_encode(sorted(set(words))))
+
+    @classmethod
+    def read(cls, path):
+        """Builds a lexicon from a word list file, one word per line."""
+        with open(path) as f:
+            return cls.from_words(line.strip() for line in f if line.strip())
+
+    @classmethod
+    def open_cache(cls, path):
+        """Memory-maps a lexicon written by save."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path)
+
+    @classmethod
+    def load(cls, path="enable1.txt", cache=True):
+        """Loads a word list, through its cache file (path + ".lexicon") when it is up to date.
+
+        The cache is written the first time the word list is read. If it can't be written the lexicon is still
+        returned."""
+        cache_path = path + CACHE_EXTENSION
+        if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            return cls.open_cache(cache_path)
+        lexicon = cls.read(path)
+        if cache:
+            try:
+                lexicon.save(cache_path)
+            except OSError:
+                pass
+        return lexicon
+
+    def save(self, path):
+        """Writes the lexicon to path."""
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(self.buffer)
+        os.replace(temporary_path, path)  # Other processes never see a partial file
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        """Returns the word with ID index."""
+        if not 0 <= index < self._length:
+            raise IndexError("Word ID out of range")
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self[index]
+
+    def index(self, word):
+        """Returns the ID of word, or None if it's not in the lexicon."""
+        encoded = word.encode("utf-8")
+        slot = zlib.crc32(encoded) & self._mask
+        slots, offsets, blob = self._slots, self._offsets, self._blob
+        while slots[slot]:
+            index = slots[slot] - 1
+            if blob[offsets[index]:offsets[index + 1]] == encoded:
+                return index
+            slot = (slot + 1) & self._mask
+        return None
+
+    def __contains__(self, word):
+        return self.index(word) is not None
+
+    def close(self):
+        """Releases the memory map of a lexicon opened from the cache."""
+        if isinstance(self.buffer, mmap.mmap):
+            self._offsets.release()
+            self._slots.release()
+            self._blob.release()
+            self.buffer.close()
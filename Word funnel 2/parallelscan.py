@@ -0,0 +1,137 @@
+"""Parallel scan of the whole lexicon for word funnels
+
+The lexicon is loaded once and copied into a shared memory block. Every worker process attaches to the block and
+reads the words and the hash table from it, without a copy of its own. The word IDs are split into chunks that the
+workers solve with a memoized depth first search, and the results are streamed to a file in dictionary order as the
+chunks come back:
+
+    word<TAB>funnel length<TAB>word => ... => last word
+
+Only the words with a funnel of at least min_length words are written, and the histogram of the funnel lengths of
+all the words is returned. With first_only the scan stops at the first word matching, like find10 in wordfunnel2.py.
+
+Usage:
+    python parallelscan.py 10 --first-only
+    python parallelscan.py 5 -o funnels.tsv
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from collections import Counter
+from multiprocessing import shared_memory
+
+from lexicon import Lexicon
+
+# Lexicon of every worker process, set by _init_worker
+_lexicon = None
+_shared = None
+
+
+def _init_worker(name):
+    global _lexicon, _shared
+    _shared = shared_memory.SharedMemory(name=name)
+    _lexicon = Lexicon(_shared.buf)
+
+
+def _longest_funnel(word, memo):
+    """Returns the longest funnel starting from word as a tuple of words."""
+    funnel = memo.get(word)
+    if funnel is None:
+        funnel = (word,)
+        for index in range(len(word)):
+            child = word[:index] + word[index + 1:]
+            if child in _lexicon:
+                child_funnel = _longest_funnel(child, memo)
+                if len(child_funnel) + 1 > len(funnel):
+                    funnel = (word,) + child_funnel
+        memo[word] = funnel
+    return funnel
+
+
+def _scan_chunk(arguments):
+    """Returns the histogram of the funnel lengths of a range of word IDs and the words reaching min_length."""
+    start, end, min_length = arguments
+    memo = {}
+    histogram = Counter()
+    matches = []
+    for index in range(start, end):
+        funnel = _longest_funnel(_lexicon[index], memo)
+        histogram[len(funnel)] += 1
+        if len(funnel) >= min_length:
+            matches.append(funnel)
+    return histogram, matches
+
+
+def scan(min_length, output=None, word_list="enable1.txt", processes=None, chunk_size=2000, first_only=False):
+    """Computes the longest funnel of every word of word_list across a pool of worker processes.
+
+    Attributes:
+        min_length (int): Funnels with at least this number of words are written to output.
+        output: A writable text file, or None to only compute the histogram.
+        word_list (str): Path of the word list.
+        processes (int): Number of worker processes, by default one per CPU.
+        chunk_size (int): Number of words sent to a worker at a time.
+        first_only (bool): Stop at the first word, in dictionary order, with a long enough funnel.
+
+    Returns:
+        A tuple (histogram, matches): a Counter of the number of words for every funnel length (only of the chunks
+        scanned when stopping early), and the number of words written.
+    """
+    lexicon = Lexicon.load(word_list)
+    buffer = bytes(lexicon.buffer)
+    lexicon.close()
+    shared = shared_memory.SharedMemory(create=True, size=len(buffer))
+    shared.buf[:len(buffer)] = buffer
+    del buffer
+
+    histogram = Counter()
+    matches = 0
+    tasks = [(start, min(start + chunk_size, len(lexicon)), min_length) for start in range(0, len(lexicon), chunk_size)]
+    try:
+        with multiprocessing.Pool(processes, _init_worker, (shared.name,)) as pool:
+            # imap keeps the dictionary order, so the first match is the same as a serial scan
+            for chunk_histogram, chunk_matches in pool.imap(_scan_chunk, tasks):
+                histogram.update(chunk_histogram)
+                for funnel in chunk_matches:
+                    if output is not None:
+                        output.write(f"{funnel[0]}\t{len(funnel)}\t{' => '.join(funnel)}\n")
+                    matches += 1
+                    if first_only:
+                        break
+                if first_only and matches:
+                    pool.terminate()  # Stop the workers still scanning the next chunks
+                    break
+    finally:
+        shared.close()
+        shared.unlink()
+    return histogram, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Finds the longest word funnel of every word of a word list.")
+    parser.add_argument("min_length", type=int, help="Write the words with a funnel of at least this length")
+    parser.add_argument("-o", "--output", default="-", help="File to write the funnels to, - for stdout")
+    parser.add_argument("-w", "--word-list", default="enable1.txt", help="Word list, one word per line")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="Worker processes, default one per CPU")
+    parser.add_argument("--first-only", action="store_true", help="Stop at the first word found")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        histogram, matches = scan(args.min_length, output_file, args.word_list, args.processes,
+                                  first_only=args.first_only)
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    print(f"{matches} words with a funnel of length {args.min_length} or more, "
+          f"{time.time() - start_time:.2f} seconds", file=sys.stderr)
+    for length in sorted(histogram):
+        print(f"Length {length}: {histogram[length]} words", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Microbenchmark of the startup of wordfunnel2
+
+Every run starts a new Python process that imports wordfunnel2 and searches one word, measuring separately the import
+and the first query, which is the one loading the lexicon. The first run is done without the lexicon cache, the
+others reuse the cache it wrote.
+
+    python startup.py --runs 10 --word princesses
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+import lexicon
+
+_CHILD = """
+import time
+start_time = time.perf_counter()
+import wordfunnel2
+imported = time.perf_counter()
+wordfunnel2.search_longest({word!r})
+print(imported - start_time, time.perf_counter() - imported)
+"""
+
+
+def measure(word="princesses", word_list=None):
+    """Returns the (import, first query) times in seconds of a new process."""
+    environment = dict(os.environ)
+    if word_list is not None:
+        environment["WORDFUNNEL_WORD_LIST"] = word_list
+    output = subprocess.run([sys.executable, "-c", _CHILD.format(word=word)], env=environment, capture_output=True,
+                            text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    import_time, query_time = map(float, output.split())
+    return import_time, query_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the import time and first query latency of wordfunnel2.")
+    parser.add_argument("-r", "--runs", type=int, default=10, help="Runs with the cache")
+    parser.add_argument("-w", "--word-list", default="enable1.txt", help="Word list, one word per line")
+    parser.add_argument("--word", default="princesses", help="Word of the first query")
+    args = parser.parse_args()
+
+    word_list = os.path.abspath(args.word_list)
+    cache_path = word_list + lexicon.CACHE_EXTENSION
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    import_time, query_time = measure(args.word, word_list)
+    print(f"Without cache: import {import_time * 1000:.2f} ms, first query {query_time * 1000:.2f} ms")
+
+    times = [measure(args.word, word_list) for _ in range(args.runs)]
+    import_times, query_times = zip(*times)
+    print(f"With cache, median of {args.runs} runs: import {statistics.median(import_times) * 1000:.2f} ms, "
+          f"first query {statistics.median(query_times) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
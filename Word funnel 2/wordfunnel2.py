@@ -1,5 +1,9 @@
+import os
 import queue
 import time
+from collections import deque
+
+from lexicon import Lexicon
 
 """This script is inspired by a reddit post which can be found here:
 https://www.reddit.com/r/dailyprogrammer/comments/99d24u/20180822_challenge_366_intermediate_word_funnel_2/
@@ -22,12 +26,33 @@ funnel2("implosive") => 1
 funnel2("programmer") => 2
 
 I implemented Breadth First Search and Depth First Search
+
+Importing the module doesn't load anything: the word list is loaded into a Lexicon on the first query, from
+word_list_path (enable1.txt next to this file, or the WORDFUNNEL_WORD_LIST environment variable). Use set_word_list
+to change it. The command line interface is in funnel.py.
 """
 
-# Load words from enable1.txt into a list
-with open("enable1.txt") as f:
-    words = f.readlines()
-words = [x.strip() for x in words]
+# Path of the word list, loaded on the first query
+word_list_path = os.environ.get("WORDFUNNEL_WORD_LIST",
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), "enable1.txt"))
+_words = None
+
+
+def set_word_list(path):
+    """Uses the word list at path from the next query on."""
+    global word_list_path, _words
+    word_list_path = path
+    _words = None
+
+
+def get_words():
+    """Returns the Lexicon of the word list, loading it on the first call.
+
+    Membership tests are O(1) and the binary cache of the Lexicon is reused by the next processes."""
+    global _words
+    if _words is None:
+        _words = Lexicon.load(word_list_path)
+    return _words
 
 
 class Node:
@@ -47,6 +72,7 @@ class Node:
     def expand(self):
         """Returns a list of child nodes of this node."""
         word_as_list = list(self.word)
+        words = get_words()
         child_nodes = []
         for index, character in enumerate(word_as_list):
             word_as_list.pop(index)
@@ -88,6 +114,56 @@ def search(input_word, algorithm):
         return None
 
 
+def search_longest(input_word, algorithm="bfs"):
+    """Searches the tree visiting every word only once, returns the longest funnels and the peak frontier size.
+
+    Every step removes one letter, so a word is always at the same depth whatever the path used to reach it and the
+    first visit is as good as any other. The nodes are kept in parallel lists (word, parent index) instead of Node
+    objects, and the frontier only holds indexes.
+
+    Attributes:
+        input_word (str): The word of the input
+        algorithm (str): bfs or dfs
+    """
+    words = get_words()
+    node_words = [input_word]
+    parents = [-1]
+    visited = {input_word}
+    fringe = deque([0])
+    peak_frontier = 1
+    leaves = []
+
+    while fringe:
+        index = fringe.popleft() if algorithm == "bfs" else fringe.pop()
+        word = node_words[index]
+        has_children = False
+        for position in range(len(word)):
+            child = word[:position] + word[position + 1:]
+            if child in words:
+                has_children = True
+                if child not in visited:
+                    visited.add(child)
+                    node_words.append(child)
+                    parents.append(index)
+                    fringe.append(len(node_words) - 1)
+        if not has_children:
+            leaves.append(index)
+        peak_frontier = max(peak_frontier, len(fringe))
+
+    # The deepest leaves are the shortest words
+    shortest = min(len(node_words[leaf]) for leaf in leaves)
+    funnels = []
+    for leaf in leaves:
+        if len(node_words[leaf]) == shortest:
+            funnel_words = []
+            while leaf != -1:
+                funnel_words.append(node_words[leaf])
+                leaf = parents[leaf]
+            funnel_words.reverse()
+            funnels.append(funnel_words)
+    return funnels, peak_frontier
+
+
 def funnel2(word, algorithm="bfs"):
     """Launches the search, calculates execution time, prints output."""
     start_time = time.time()
@@ -116,7 +192,7 @@ def find10(algorithm):
     Find the one word in the word list that starts a funnel of length 10.
     """
     start_time = time.time()
-    for word in words:
+    for word in get_words():
         print("Checking {}".format(word))
         solutions = search(word, algorithm)
         maximum = max(solution.depth for solution in solutions)
@@ -142,9 +218,19 @@ def find10(algorithm):
             print(f"Funnel length: {maximum}")
 
 
-funnel2("gnash")
-funnel2("princesses")
-funnel2("turntables")
-funnel2("implosive")
-funnel2("programmer")
-find10("bfs")
+def demo():
+    """Runs the examples of the challenge and the optional bonus 1."""
+    funnel2("gnash")
+    for algorithm in ("bfs", "dfs"):
+        funnels, peak_frontier = search_longest("princesses", algorithm)
+        print(f"Deduplicated {algorithm}: {len(funnels)} longest funnels of length {len(funnels[0])}, "
+              f"peak frontier {peak_frontier}")
+    funnel2("princesses")
+    funnel2("turntables")
+    funnel2("implosive")
+    funnel2("programmer")
+    find10("bfs")
+
+
+if __name__ == "__main__":
+    demo()